@@ -0,0 +1,148 @@
+"""
+Benchmark HTML extraction backends over a saved corpus of news pages
+Compares throughput and extracted text of every backend against 'bs4'
+(the original BeautifulSoup extractor).
+
+Usage:
+    python bench_html_extract.py <corpus_dir>
+    python bench_html_extract.py <corpus_dir> --save-urls urls.txt   # snapshot pages first
+    python bench_html_extract.py <corpus_dir> --repeat 3 --backends bs4 lxml
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import time
+
+from pipeline.html_extract import EXTRACTORS, available_extractors
+
+
+def save_corpus(urls_file: str, corpus_dir: str):
+    """Download each URL once into corpus_dir/<sha1>.html"""
+    import requests
+    from pipeline.config import HEADERS
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    with open(urls_file, encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip()]
+
+    saved = 0
+    for url in urls:
+        path = os.path.join(corpus_dir, hashlib.sha1(url.encode()).hexdigest() + ".html")
+        if os.path.exists(path):
+            continue
+        try:
+            resp = session.get(url, timeout=10)
+            if resp.status_code == 200:
+                with open(path, "w", encoding="utf-8") as out:
+                    out.write(resp.text)
+                saved += 1
+        except Exception as e:
+            print(f"   ⚠️ {url}: {e}")
+    print(f"💾 Saved {saved} new pages to {corpus_dir}")
+
+
+def load_corpus(corpus_dir: str):
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(corpus_dir, name), encoding="utf-8", errors="replace") as f:
+                pages.append((name, f.read()))
+    return pages
+
+
+def _tokens(text):
+    return set(re.findall(r"\w+", (text or "").lower()))
+
+
+def compare_text(reference, candidate):
+    """Token Jaccard similarity of two extractions (1.0 when both are None)"""
+    if reference is None and candidate is None:
+        return 1.0
+    ref, cand = _tokens(reference), _tokens(candidate)
+    if not ref and not cand:
+        return 1.0
+    return len(ref & cand) / len(ref | cand)
+
+
+def run_backend(name, pages, repeat):
+    extract = EXTRACTORS[name]
+    best = None
+    outputs = None
+    for _ in range(repeat):
+        results = []
+        start = time.perf_counter()
+        for _, html in pages:
+            try:
+                results.append(extract(html))
+            except Exception:
+                results.append(None)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+        outputs = results
+    return best, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article HTML extractors")
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--save-urls", type=str, default=None,
+                        help="file with one URL per line to download into corpus_dir first")
+    parser.add_argument("--backends", nargs="+", default=list(available_extractors()))
+    parser.add_argument("--repeat", type=int, default=1, help="runs per backend, best time kept")
+    args = parser.parse_args()
+
+    if args.save_urls:
+        save_corpus(args.save_urls, args.corpus_dir)
+
+    pages = load_corpus(args.corpus_dir)
+    if not pages:
+        print(f"❌ No .html pages found in {args.corpus_dir}")
+        return 1
+
+    total_mb = sum(len(html.encode("utf-8")) for _, html in pages) / 1e6
+    print("=" * 80)
+    print(f"🧪 HTML EXTRACTION BENCHMARK: {len(pages)} pages, {total_mb:.1f} MB")
+    print("=" * 80)
+
+    backends = ["bs4"] + [b for b in args.backends if b != "bs4"]
+    results = {}
+    for name in backends:
+        if name not in available_extractors():
+            print(f"⚠️ Backend '{name}' not installed, skipping")
+            continue
+        results[name] = run_backend(name, pages, args.repeat)
+
+    reference = results["bs4"][1]
+    print(f"\n{'Backend':<8} {'Time':>8} {'Pages/s':>9} {'MB/s':>7} {'Speedup':>8} "
+          f"{'Extracted':>10} {'Same':>6} {'Mean sim':>9} {'Min sim':>8}")
+    print("-" * 80)
+    for name, (elapsed, outputs) in results.items():
+        sims = [compare_text(r, o) for r, o in zip(reference, outputs)]
+        extracted = sum(1 for o in outputs if o)
+        same = sum(1 for r, o in zip(reference, outputs) if r == o)
+        print(f"{name:<8} {elapsed:>7.2f}s {len(pages) / elapsed:>9.1f} {total_mb / elapsed:>7.2f} "
+              f"{results['bs4'][0] / elapsed:>7.1f}x {extracted:>10} {same:>6} "
+              f"{sum(sims) / len(sims):>9.3f} {min(sims):>8.3f}")
+
+    # Pages where a backend disagrees with bs4 on whether there is an article at all
+    for name, (_, outputs) in results.items():
+        if name == "bs4":
+            continue
+        flips = [pages[i][0] for i, (r, o) in enumerate(zip(reference, outputs)) if bool(r) != bool(o)]
+        if flips:
+            print(f"\n⚠️ {name}: {len(flips)} pages extracted by only one backend:")
+            for page in flips[:10]:
+                print(f"   • {page}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Accuracy-drift report for the int8 ONNX inference backend
+Runs a fixed fixture set through the fp32 torch path and the quantized ONNX
+path and compares them:
+  - zero-shot scores (the pipeline's sentiment, realism and comment prompts):
+    mean/max absolute score difference and top-label agreement
+  - MiniLM embeddings: cosine similarity between fp32 and int8 vectors, and
+    whether each question still retrieves the same top article
+plus wall time of each backend (NLI cache bypassed).
+
+Usage:
+    python bench_inference_drift.py
+    python bench_inference_drift.py --repeat 3 --worst 10
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from pipeline import nli_cache
+from pipeline.inference import InferenceService
+from pipeline.nli import zero_shot_many
+from pipeline.validation import REALISM_CATEGORIES
+
+
+QUESTIONS = [
+    "Will the Federal Reserve cut interest rates before July 2025?",
+    "Will Bitcoin close above $100,000 on December 31?",
+    "Will the Kansas City Chiefs win the Super Bowl?",
+    "Will OpenAI release GPT-5 before the end of the year?",
+    "Will a ceasefire between Israel and Hamas hold for 30 days?",
+    "Will Elon Musk see a ghost in 2025?",
+]
+
+ARTICLES = [
+    "Federal Reserve officials signaled on Wednesday that they expect to lower borrowing costs "
+    "later this year, with futures markets now pricing a 70% chance of a cut by June as inflation cools.",
+    "Fed Chair Jerome Powell said the central bank is in no hurry to ease policy, warning that "
+    "sticky services inflation could keep rates higher for longer than investors expect.",
+    "Bitcoin slid below $90,000 on Tuesday as ETF outflows accelerated and traders unwound "
+    "leveraged long positions ahead of the holiday season.",
+    "Analysts at Standard Chartered reiterated their $150,000 year-end target for bitcoin, "
+    "citing record institutional inflows and a shrinking exchange supply.",
+    "Patrick Mahomes threw three touchdowns as the Chiefs clinched the top seed in the AFC, "
+    "making them the betting favorite to win a third straight championship.",
+    "The Chiefs' offensive line injuries have piled up, and several analysts now doubt the team "
+    "can get past Baltimore or Buffalo in the playoffs.",
+    "OpenAI CEO Sam Altman said the company has no plans to ship GPT-5 this year and is focused "
+    "on improving its existing reasoning models.",
+    "Negotiators said the truce remained fragile after both sides accused each other of violations "
+    "within the first week, raising doubts it would last the month.",
+]
+
+COMMENTS = [
+    "Powell basically confirmed it at the presser, I'm buying YES up to 80%.",
+    "Markets always overprice cuts. Core PCE is still way above target, no way they move this early.",
+    "This resolves NO, the question creator already said ETF price doesn't count.",
+    "lol",
+]
+
+ENCODER_TEXTS = QUESTIONS + ARTICLES + COMMENTS
+
+
+def nli_fixtures():
+    """(sequence, candidate_labels) requests in the shapes the pipeline sends"""
+    requests = []
+    for question in QUESTIONS:
+        for article in ARTICLES:
+            requests.append((article, [f"YES: {question}", f"NO: {question}"]))
+        for comment in COMMENTS:
+            requests.append((comment, [f"This supports: {question}", f"This opposes: {question}"]))
+        requests.append((question, REALISM_CATEGORIES))
+    return requests
+
+
+def run_backend(service, requests, repeat):
+    best_nli = best_enc = None
+    results = embeddings = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = zero_shot_many(service.classifier, requests)
+        elapsed = time.perf_counter() - start
+        best_nli = elapsed if best_nli is None else min(best_nli, elapsed)
+
+        start = time.perf_counter()
+        embeddings = service.encode(ENCODER_TEXTS)
+        elapsed = time.perf_counter() - start
+        best_enc = elapsed if best_enc is None else min(best_enc, elapsed)
+    return best_nli, best_enc, results, np.asarray(embeddings, dtype=np.float32)
+
+
+def label_scores(result, labels):
+    """Scores in the original candidate-label order"""
+    by_label = dict(zip(result["labels"], result["scores"]))
+    return np.array([by_label[label] for label in labels])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare int8 ONNX inference against fp32 torch")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per backend, best time kept")
+    parser.add_argument("--worst", type=int, default=5, help="largest score drifts to list")
+    args = parser.parse_args()
+
+    nli_cache.NLI_CACHE_ENABLED = False         # time real forwards, not cache hits
+
+    reference = InferenceService(backend="torch")
+    candidate = InferenceService(backend="onnx")
+    if candidate.backend != "onnx":
+        print("❌ ONNX backend unavailable (pip install onnxruntime optimum-onnx)")
+        return 1
+
+    requests = nli_fixtures()
+    print("=" * 80)
+    print(f"🧪 INFERENCE DRIFT: {len(requests)} zero-shot requests, {len(ENCODER_TEXTS)} encoder texts")
+    print("=" * 80)
+
+    ref_nli_t, ref_enc_t, ref_results, ref_emb = run_backend(reference, requests, args.repeat)
+    cand_nli_t, cand_enc_t, cand_results, cand_emb = run_backend(candidate, requests, args.repeat)
+
+    # Zero-shot scores
+    diffs, same_top, failed = [], 0, 0
+    for (seq, labels), ref, cand in zip(requests, ref_results, cand_results):
+        if ref is None or cand is None:
+            failed += 1
+            continue
+        diff = np.abs(label_scores(ref, labels) - label_scores(cand, labels)).max()
+        diffs.append((diff, seq, labels, ref, cand))
+        same_top += ref["labels"][0] == cand["labels"][0]
+
+    max_diffs = np.array([d[0] for d in diffs]) if diffs else np.zeros(1)
+    print(f"\n{'Zero-shot':<10} {'fp32':>8} {'int8':>8} {'Speedup':>8} {'Top-1 same':>11} "
+          f"{'Mean |Δ|':>9} {'P95 |Δ|':>8} {'Max |Δ|':>8} {'Failed':>7}")
+    print("-" * 80)
+    print(f"{'':<10} {ref_nli_t:>7.2f}s {cand_nli_t:>7.2f}s {ref_nli_t / cand_nli_t:>7.1f}x "
+          f"{same_top:>5}/{len(diffs):<5} {max_diffs.mean():>9.4f} {np.percentile(max_diffs, 95):>8.4f} "
+          f"{max_diffs.max():>8.4f} {failed:>7}")
+
+    # Sentence embeddings
+    cosine = (ref_emb * cand_emb).sum(axis=1) / (
+        np.linalg.norm(ref_emb, axis=1) * np.linalg.norm(cand_emb, axis=1))
+    n_q = len(QUESTIONS)
+    docs = slice(n_q, n_q + len(ARTICLES))
+    ref_top = (ref_emb[:n_q] @ ref_emb[docs].T).argmax(axis=1)
+    cand_top = (cand_emb[:n_q] @ cand_emb[docs].T).argmax(axis=1)
+    print(f"\n{'Encoder':<10} {'fp32':>8} {'int8':>8} {'Speedup':>8} {'Mean cos':>9} {'Min cos':>8} "
+          f"{'Same top article':>17}")
+    print("-" * 80)
+    print(f"{'':<10} {ref_enc_t:>7.2f}s {cand_enc_t:>7.2f}s {ref_enc_t / cand_enc_t:>7.1f}x "
+          f"{cosine.mean():>9.4f} {cosine.min():>8.4f} {int((ref_top == cand_top).sum()):>11}/{n_q}")
+
+    # Fixtures that drifted most
+    diffs.sort(key=lambda d: d[0], reverse=True)
+    if diffs and args.worst > 0:
+        print(f"\n⚠️ Largest zero-shot drifts:")
+        for diff, seq, labels, ref, cand in diffs[:args.worst]:
+            flip = "" if ref["labels"][0] == cand["labels"][0] else "  (top label flipped)"
+            print(f"   • |Δ|={diff:.4f}{flip}  {seq[:50]!r} vs {labels[0][:40]!r}")
+            print(f"     fp32 {np.round(label_scores(ref, labels), 3).tolist()}  "
+                  f"int8 {np.round(label_scores(cand, labels), 3).tolist()}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+article_cache.py - Persistent cache of extracted article bodies
+Keyed by canonical URL. Each entry keeps the extracted fulltext plus the
+ETag / Last-Modified validators, so stale entries are revalidated with a
+conditional GET (304 -> reuse) instead of being re-downloaded and re-parsed.
+"""
+import json
+import time
+from typing import Dict, Optional
+
+from .disk_cache import DiskCache
+from .url_dedup import canonicalize_url
+from .config import (
+    ARTICLE_CACHE_ENABLED,
+    ARTICLE_CACHE_PATH,
+    ARTICLE_CACHE_MAX_ENTRIES,
+    ARTICLE_CACHE_FRESH_SECONDS,
+    ARTICLE_CACHE_TTL_SECONDS
+)
+
+
+class CachedArticle:
+    __slots__ = ('fulltext', 'etag', 'last_modified', 'final_url', 'fetched_at')
+
+    def __init__(self, fulltext, etag=None, last_modified=None, final_url=None, fetched_at=None):
+        self.fulltext = fulltext
+        self.etag = etag
+        self.last_modified = last_modified
+        self.final_url = final_url
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    def is_fresh(self, fresh_seconds: float) -> bool:
+        return time.time() - self.fetched_at < fresh_seconds
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_bytes(self) -> bytes:
+        return json.dumps({s: getattr(self, s) for s in self.__slots__}).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> 'CachedArticle':
+        return cls(**json.loads(blob.decode('utf-8')))
+
+
+class ArticleCache:
+    """
+    fresh_seconds: served straight from disk, no network
+    ttl_seconds:   after this the entry is dropped and the page re-fetched
+    in between:    revalidated with If-None-Match / If-Modified-Since
+    """
+
+    def __init__(self, path: str, max_entries: int, fresh_seconds: float, ttl_seconds: float):
+        self._store = DiskCache(path, table="articles", max_entries=max_entries)
+        self.fresh_seconds = fresh_seconds
+        self.ttl_seconds = ttl_seconds
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'expired': 0}
+
+    def lookup(self, url: str) -> Optional[CachedArticle]:
+        key = canonicalize_url(url)
+        if key is None:
+            return None
+        try:
+            blob = self._store.get(key)
+        except Exception as e:
+            print(f"  ⚠️ Article cache unavailable: {e}")
+            return None
+        if blob is None:
+            self.stats['misses'] += 1
+            return None
+        try:
+            entry = CachedArticle.from_bytes(blob)
+        except (ValueError, TypeError):
+            # corrupt or old-format entry: drop it and re-fetch
+            self.stats['misses'] += 1
+            self._store.delete_many([key])
+            return None
+        # expired, or a failed extraction stored by an older run: re-fetch
+        if entry.fulltext is None or time.time() - entry.fetched_at >= self.ttl_seconds:
+            self.stats['expired'] += 1
+            self._store.delete_many([key])
+            return None
+        return entry
+
+    def is_fresh(self, entry: CachedArticle) -> bool:
+        return entry.is_fresh(self.fresh_seconds)
+
+    def store(self, url: str, fulltext: Optional[str], etag: Optional[str] = None,
+              last_modified: Optional[str] = None, final_url: Optional[str] = None) -> None:
+        key = canonicalize_url(url)
+        if key is None:
+            return
+        entry = CachedArticle(fulltext, etag, last_modified, final_url)
+        try:
+            self._store.set(key, entry.to_bytes())
+        except Exception as e:
+            print(f"  ⚠️ Failed to write article cache: {e}")
+
+    def mark_revalidated(self, url: str, entry: CachedArticle) -> None:
+        """Server answered 304: restart the freshness window"""
+        self.stats['revalidated'] += 1
+        self.store(url, entry.fulltext, entry.etag, entry.last_modified, entry.final_url)
+
+    def summary(self) -> str:
+        return (f"{self.stats['fresh_hits']} fresh hits | {self.stats['revalidated']} revalidated (304) | "
+                f"{self.stats['misses']} misses | {self.stats['expired']} expired")
+
+
+_cache = None                       # lazy init
+
+
+def get_article_cache() -> Optional[ArticleCache]:
+    """Process-wide cache, or None when disabled in config"""
+    global _cache
+    if not ARTICLE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ArticleCache(
+            ARTICLE_CACHE_PATH,
+            ARTICLE_CACHE_MAX_ENTRIES,
+            ARTICLE_CACHE_FRESH_SECONDS,
+            ARTICLE_CACHE_TTL_SECONDS
+        )
+    return _cache
@@ -0,0 +1,227 @@
+"""
+async_fetch.py - Connection-pooled asyncio article body fetcher
+One shared aiohttp session for every download: keep-alive connections are
+reused across articles, with global and per-host concurrency caps, an
+optional bandwidth cap and hard timeouts.
+
+Two stages joined by a bounded queue: coroutines download raw bytes, and
+HTML parsing runs on a process pool so ingestion scales with cores.
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import aiohttp
+
+from .html_extract import extract_article_bytes, resolve_backend
+from .article_cache import get_article_cache
+from .config import (
+    HEADERS,
+    MAX_WORKERS_ARTICLES,
+    ARTICLE_FETCH_PER_HOST,
+    ARTICLE_FETCH_TIMEOUT,
+    ARTICLE_FETCH_CONNECT_TIMEOUT,
+    ARTICLE_FETCH_MAX_BYTES_PER_SEC,
+    ARTICLE_FETCH_MAX_PAGE_BYTES,
+    ARTICLE_PARSE_WORKERS,
+    ARTICLE_PARSE_QUEUE_SIZE
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens/sec refill up to `capacity`.
+    Used both as a request rate limit and (over bytes) as a bandwidth cap.
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: float = 1) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # oversized requests go through once the bucket is full
+                if self.tokens >= n or self.tokens >= self.capacity:
+                    self.tokens -= n
+                    return
+                await asyncio.sleep((min(n, self.capacity) - self.tokens) / self.rate)
+
+
+class RawPage(NamedTuple):
+    body: Optional[bytes]           # None when the server answered 304
+    charset: Optional[str]
+    final_url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    not_modified: bool = False
+
+
+class AsyncArticleFetcher:
+    """
+    Usage (parse_workers=0 parses in a thread instead of a process pool):
+        async with AsyncArticleFetcher() as fetcher:
+            text = await fetcher.fetch(url)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_WORKERS_ARTICLES,
+        per_host: int = ARTICLE_FETCH_PER_HOST,
+        timeout: float = ARTICLE_FETCH_TIMEOUT,
+        connect_timeout: float = ARTICLE_FETCH_CONNECT_TIMEOUT,
+        max_bytes_per_sec: float = ARTICLE_FETCH_MAX_BYTES_PER_SEC,
+        max_page_bytes: int = ARTICLE_FETCH_MAX_PAGE_BYTES,
+        parse_workers: int = ARTICLE_PARSE_WORKERS,
+        parse_queue_size: int = ARTICLE_PARSE_QUEUE_SIZE
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.max_page_bytes = max_page_bytes
+        self._bandwidth = TokenBucket(max_bytes_per_sec)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.parse_workers = parse_workers
+        self.parse_queue_size = parse_queue_size
+        self._backend = resolve_backend(None)
+        self._cache = get_article_cache()
+        self._session = None
+        self._parse_pool = None
+        self._parse_queue = None
+        self._parsers = []
+        self.stats = {'requests': 0, 'ok': 0, 'not_modified': 0, 'failed': 0, 'bytes': 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers=HEADERS
+        )
+        # parsing runs in other processes so it is not serialized by the GIL
+        self._parse_pool = (
+            ProcessPoolExecutor(max_workers=self.parse_workers) if self.parse_workers > 0 else None
+        )
+        self._parse_queue = asyncio.Queue(maxsize=self.parse_queue_size)
+        n_consumers = max(1, self.parse_workers) * 2
+        self._parsers = [asyncio.create_task(self._parse_worker()) for _ in range(n_consumers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for task in self._parsers:
+            task.cancel()
+        await asyncio.gather(*self._parsers, return_exceptions=True)
+        self._parsers = []
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
+        await self._session.close()
+        self._session = None
+
+    async def fetch_raw(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[RawPage]:
+        """
+        Network stage: download a page (optionally a conditional GET).
+        None on non-200/304, oversize page or network error.
+        """
+        if not url:
+            return None
+        async with self._slots:
+            self.stats['requests'] += 1
+            try:
+                async with self._session.get(url, allow_redirects=True, headers=headers) as resp:
+                    validators = (resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+                    if resp.status == 304:
+                        self.stats['not_modified'] += 1
+                        return RawPage(None, None, str(resp.url), *validators, not_modified=True)
+                    if resp.status != 200:
+                        self.stats['failed'] += 1
+                        return None
+                    chunks = []
+                    size = 0
+                    async for chunk in resp.content.iter_chunked(65536):
+                        await self._bandwidth.acquire(len(chunk))
+                        size += len(chunk)
+                        if size > self.max_page_bytes:
+                            self.stats['failed'] += 1
+                            return None
+                        chunks.append(chunk)
+                    self.stats['bytes'] += size
+                    self.stats['ok'] += 1
+                    return RawPage(b"".join(chunks), resp.charset, str(resp.url), *validators)
+            except Exception:
+                self.stats['failed'] += 1
+                return None
+
+    async def _parse_worker(self):
+        """CPU stage: move queued pages through the parse pool"""
+        loop = asyncio.get_running_loop()
+        while True:
+            body, charset, done = await self._parse_queue.get()
+            try:
+                text = await loop.run_in_executor(
+                    self._parse_pool, extract_article_bytes, body, charset, self._backend
+                )
+                if not done.done():
+                    done.set_result(text)
+            except Exception:
+                if not done.done():
+                    done.set_result(None)
+            finally:
+                self._parse_queue.task_done()
+
+    async def fetch_page(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """Download and extract the article body -> (text, final url)"""
+        cache = self._cache
+        entry = cache.lookup(url) if cache is not None and url else None
+        if entry is not None and cache.is_fresh(entry):
+            cache.stats['fresh_hits'] += 1
+            return entry.fulltext, entry.final_url or url
+
+        page = await self.fetch_raw(url, entry.conditional_headers() if entry is not None else None)
+        if page is None:
+            return None, None
+        if page.not_modified:
+            if entry is None:
+                return None, page.final_url
+            cache.mark_revalidated(url, entry)
+            return entry.fulltext, entry.final_url or page.final_url
+
+        done = asyncio.get_running_loop().create_future()
+        # bounded: downloads wait here when parsing falls behind
+        await self._parse_queue.put((page.body, page.charset, done))
+        text = await done
+        # failed extractions are not cached, so the next run retries them
+        if cache is not None and text is not None:
+            cache.store(url, text, page.etag, page.last_modified, page.final_url)
+        return text, page.final_url
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Download and extract the article body"""
+        text, _ = await self.fetch_page(url)
+        return text
+
+
+async def _fetch_all(urls, **fetcher_kwargs) -> Dict[str, Optional[str]]:
+    async with AsyncArticleFetcher(**fetcher_kwargs) as fetcher:
+        unique = list(dict.fromkeys(u for u in urls if u))
+        texts = await asyncio.gather(*(fetcher.fetch(u) for u in unique))
+        return dict(zip(unique, texts))
+
+
+def fetch_article_bodies(urls: Iterable[str], **fetcher_kwargs) -> Dict[str, Optional[str]]:
+    """Blocking entry point: url -> extracted fulltext (or None)"""
+    return asyncio.run(_fetch_all(list(urls), **fetcher_kwargs))
@@ -1,6 +1,7 @@
 """
 Configuration for Prediction Market Analysis Pipeline
 """
+import os
 import nltk
 from nltk.corpus import stopwords
 import spacy
@@ -53,9 +54,85 @@ MIN_TOPIC_SIZE = 5  # Require more articles per topic for significance
 TOP_N_MARKETS = 20
 SIMILARITY_THRESHOLD = 0.15  # Higher threshold for better matches
 
+# Caching (persists across scheduled runs)
+CACHE_DIR = os.environ.get("SENTINEL_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache"))
+EMBEDDING_CACHE_PATH = os.path.join(CACHE_DIR, "embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 200000  # ~300 MB of 384-dim float32 vectors
+
+# Market fetching (paginated, most liquid first)
+MARKET_FETCH_BUDGET = 2000  # max markets requested per platform
+MARKET_PAGE_SIZE = 200
+MAX_WORKERS_MARKET_PAGES = 4  # pages in flight per platform
+MARKET_PAGE_RETRIES = 2  # extra attempts for a failed page request
+
+# Resolved Manifold markets (CSV: price,outcome) to refit the bias calibration from, None = built-in coefficients
+MANIFOLD_RESOLVED_MARKETS_PATH = os.environ.get("SENTINEL_MANIFOLD_RESOLVED")
+
 # Multithreading
-MAX_WORKERS_ARTICLES = 15
-MAX_WORKERS_MARKETS = 10
+MAX_WORKERS_ARTICLES = 32  # concurrent article downloads (async, not threads)
+MAX_WORKERS_MARKETS = 10  # market-analysis processes (capped at CPU count)
+PARALLEL_MARKETS = True  # fork workers after model load; serial on GPU or where fork is unavailable
+MARKET_CHUNK_SIZE = 4  # markets per worker task
+
+# NewsAPI query scheduling
+NEWSAPI_QUERIES_PER_SEC = 2.0  # token-bucket refill rate
+NEWSAPI_QUERY_BURST = 3
+
+# Near-duplicate (syndicated) article collapsing
+NEAR_DUP_THRESHOLD = 0.8  # estimated Jaccard over word shingles
+NEAR_DUP_NUM_PERM = 128
+NEAR_DUP_BANDS = 16  # 16 bands x 8 rows
+NEAR_DUP_SHINGLE_SIZE = 5  # words per shingle
+
+# HTML extraction backend: 'lxml' (fast, C parser) or 'bs4' (pure-Python reference)
+HTML_EXTRACTOR = 'lxml'
+
+# Article body fetching (shared async HTTP pool)
+ARTICLE_FETCH_PER_HOST = 4
+ARTICLE_FETCH_TIMEOUT = 10  # seconds, whole request
+ARTICLE_FETCH_CONNECT_TIMEOUT = 5
+ARTICLE_FETCH_MAX_BYTES_PER_SEC = 0  # bandwidth cap, 0 = unlimited
+ARTICLE_FETCH_MAX_PAGE_BYTES = 5_000_000
+ARTICLE_PARSE_WORKERS = os.cpu_count() or 2  # HTML parse processes, 0 = parse in a thread
+ARTICLE_PARSE_QUEUE_SIZE = 64  # downloaded pages waiting to be parsed
+
+# Persistent article cache (extracted fulltext + ETag/Last-Modified)
+ARTICLE_CACHE_ENABLED = True
+ARTICLE_CACHE_PATH = os.path.join(CACHE_DIR, "articles.sqlite")
+ARTICLE_CACHE_MAX_ENTRIES = 20000
+ARTICLE_CACHE_FRESH_SECONDS = 6 * 3600  # served without revalidation
+ARTICLE_CACHE_TTL_SECONDS = 7 * 24 * 3600  # covers the 5-day FROM_DATE window
+
+# Market snapshots (skip signal extraction for unchanged markets)
+MARKET_SNAPSHOT_ENABLED = True
+MARKET_SNAPSHOT_PATH = os.path.join(CACHE_DIR, "markets.sqlite")
+MARKET_SNAPSHOT_MAX_ENTRIES = 50000
+MARKET_SNAPSHOT_PRICE_EPSILON = 0.01  # raw price move that forces a recompute
+MARKET_SNAPSHOT_MAX_AGE_SECONDS = 24 * 3600  # recompute at least daily
+
+# Models (one copy each, owned by the inference service)
+NLI_MODEL_NAME = "facebook/bart-large-mnli"
+ENCODER_MODEL_NAME = "all-MiniLM-L6-v2"
+INFERENCE_MAX_BATCH_REQUESTS = 256  # flush a micro-batch once this many zero-shot requests are queued
+INFERENCE_MAX_WAIT_MS = 10          # ...or once the oldest queued request has waited this long
+
+# Inference backend: 'torch' (fp32 transformers) or 'onnx' (int8-quantized ONNX Runtime, CPU only)
+INFERENCE_BACKEND = os.environ.get("SENTINEL_INFERENCE_BACKEND", "torch")
+ONNX_MODEL_DIR = os.path.join(CACHE_DIR, "onnx")  # exported + quantized graphs
+ONNX_QUANTIZATION = 'auto'  # dynamic int8 preset: 'auto', 'avx512_vnni', 'avx512', 'avx2' or 'arm64'
+
+# Two-tier sentiment cascade: a distilled NLI model scores every article first,
+# only articles whose YES/NO margin falls inside the band are re-scored by NLI_MODEL_NAME
+NLI_CASCADE_ENABLED = False  # changes sentiment scores and loads a second model, so opt-in
+NLI_FAST_MODEL_NAME = "valhalla/distilbart-mnli-12-3"
+NLI_CASCADE_BAND = 0.40  # escalate when |P(YES) - P(NO)| < band
+
+# Zero-shot (NLI) inference
+NLI_BATCH_SIZE = 16  # (premise, hypothesis) pairs per forward pass
+NLI_CACHE_ENABLED = True
+NLI_CACHE_MEMORY_ENTRIES = 50000
+NLI_CACHE_PATH = os.path.join(CACHE_DIR, "nli.sqlite")
+NLI_CACHE_MAX_ENTRIES = 500000
 
 # Inefficiency Detection Thresholds
 MIN_CONFIDENCE_GAP = 0.15  # Minimum gap between market odds and news
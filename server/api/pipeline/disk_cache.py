@@ -0,0 +1,121 @@
+"""
+disk_cache.py - Small SQLite key/blob store with size-bounded LRU eviction
+Shared by the on-disk caches so warm runs can skip repeated work.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class DiskCache:
+    """
+    Persistent key -> bytes mapping backed by one SQLite table.
+
+    Every read bumps the row's access time; once the table grows past
+    max_entries the least recently used rows are deleted.
+    Connections are opened per process, so the cache survives a fork.
+    """
+
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 100000):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn_pid = None
+        self._conn_obj = None
+        self._writes_since_evict = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        pid = os.getpid()
+        if self._conn_obj is None or self._conn_pid != pid:
+            dirname = os.path.dirname(self.path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table}(accessed)"
+            )
+            conn.commit()
+            self._conn_obj = conn
+            self._conn_pid = pid
+        return self._conn_obj
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """Return the cached values for whichever keys are present"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+        with self._lock:
+            conn = self._conn()
+            # stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, value FROM {self.table} WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                conn.executemany(
+                    f"UPDATE {self.table} SET accessed = ? WHERE key = ?",
+                    [(now, k) for k in found]
+                )
+                conn.commit()
+        return found
+
+    def set_many(self, items: Dict[str, bytes]) -> None:
+        """Insert or replace values, then evict if over capacity"""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._conn()
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, accessed) VALUES (?, ?, ?)",
+                [(k, sqlite3.Binary(v), now) for k, v in items.items()]
+            )
+            conn.commit()
+            self._writes_since_evict += len(items)
+            if self._writes_since_evict >= max(1, self.max_entries // 20):
+                self._evict(conn)
+                self._writes_since_evict = 0
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock:
+            conn = self._conn()
+            conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(k,) for k in keys])
+            conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.get_many([key]).get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self.set_many({key: value})
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                (excess,)
+            )
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -0,0 +1,66 @@
+"""
+embedding_cache.py - Content-addressed sentence embedding store
+Key = sha1(model name + text), value = raw float32 vector.
+"""
+import hashlib
+import numpy as np
+from typing import Callable, List
+
+from .disk_cache import DiskCache
+from .config import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES
+
+_store = None                       # lazy init
+
+
+def _get_store() -> DiskCache:
+    global _store
+    if _store is None:
+        _store = DiskCache(EMBEDDING_CACHE_PATH, table="embeddings",
+                           max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    return _store
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    return hashlib.sha1(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def encode_cached(
+    encode_fn: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    texts: List[str]
+) -> np.ndarray:
+    """
+    Return float32 embeddings for texts, running encode_fn only on cache misses.
+    encode_fn takes a list of texts and returns an (n, dim) array.
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    store = _get_store()
+    keys = [embedding_key(model_name, t) for t in texts]
+    try:
+        cached = store.get_many(keys)
+    except Exception as e:
+        print(f"  ⚠️ Embedding cache unavailable: {e}")
+        cached = {}
+
+    # encode each distinct missing text once
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    fresh = {}
+    if missing:
+        vectors = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+        fresh = dict(zip(missing.keys(), vectors))
+        try:
+            store.set_many({k: v.tobytes() for k, v in fresh.items()})
+        except Exception as e:
+            print(f"  ⚠️ Failed to write embedding cache: {e}")
+
+    rows = [
+        fresh[k] if k in fresh else np.frombuffer(cached[k], dtype=np.float32)
+        for k in keys
+    ]
+    return np.ascontiguousarray(np.vstack(rows), dtype=np.float32)
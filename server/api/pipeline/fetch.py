@@ -4,81 +4,167 @@ Accept ALL markets, let the signal extraction decide if they're good
 """
 import requests
 import json
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import time
 import re
 
+from .config import MARKET_FETCH_BUDGET, MARKET_PAGE_SIZE, MAX_WORKERS_MARKET_PAGES, MARKET_PAGE_RETRIES
+from .records import Market, MarketBatch
+from .manifold_bias import calibrated_probs
+
+# ============================================================================
+# PAGINATION
+# ============================================================================
+
+def _fetch_page_with_retries(
+    fetch_page: Callable[[int, int], List[Dict]],
+    offset: int,
+    limit: int,
+    retries: int = MARKET_PAGE_RETRIES
+) -> List[Dict]:
+    """fetch_page, retried with a short backoff; re-raises the last error"""
+    for attempt in range(retries + 1):
+        try:
+            return fetch_page(offset, limit)
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def _fetch_paginated(
+    fetch_page: Callable[[int, int], List[Dict]],
+    process: Callable[[Dict], Optional[Market]],
+    budget: int,
+    page_size: int,
+    min_liquidity: Optional[float] = None,
+    max_workers: int = MAX_WORKERS_MARKET_PAGES
+) -> List[Market]:
+    """
+    Fetch up to `budget` raw markets, `max_workers` pages at a time.
+    Pages are requested most-liquid first, so paging stops at the first
+    short/empty page or once a page's liquidity drops below min_liquidity.
+    A page that still fails after retries is skipped; it does not end paging.
+    """
+    processed_markets = []
+    offset = 0
+    done = False
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while not done and offset < budget:
+            offsets = [offset + i * page_size for i in range(max_workers) if offset + i * page_size < budget]
+            sizes = [min(page_size, budget - o) for o in offsets]
+            futures = [executor.submit(_fetch_page_with_retries, fetch_page, o, n) for o, n in zip(offsets, sizes)]
+            
+            # consume pages in order so the result is deterministic
+            for future, o, size in zip(futures, offsets, sizes):
+                try:
+                    page = future.result()
+                except Exception as e:
+                    print(f"  ⚠️ Page fetch failed at offset {o}, skipping it: {e}")
+                    continue
+                
+                page_markets = [m for m in (process(raw) for raw in page) if m is not None]
+                processed_markets.extend(page_markets)
+                
+                if len(page) < size:
+                    done = True
+                elif min_liquidity is not None and page_markets and \
+                        min(m.liquidity for m in page_markets) < min_liquidity:
+                    done = True
+                if done:
+                    break
+            
+            offset = offsets[-1] + page_size
+    
+    return processed_markets
+
+
 # ============================================================================
 # POLYMARKET (No filtering)
 # ============================================================================
 
-def fetch_polymarket_markets(limit: int = 100) -> List[Dict]:
-    """Fetch ALL active Polymarket markets"""
+def _fetch_polymarket_page(offset: int, limit: int) -> List[Dict]:
+    """One page of open Polymarket markets, most liquid first"""
+    url = "https://gamma-api.polymarket.com/markets"
+    params = {
+        'closed': 'false',
+        'limit': limit,
+        'offset': offset,
+        'order': 'liquidityNum',
+        'ascending': 'false'
+    }
+    
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    
+    return response.json()
+
+
+def _process_polymarket_market(market: Dict) -> Optional[Market]:
+    """Normalize one raw Polymarket market, None if unusable"""
     try:
-        url = "https://gamma-api.polymarket.com/markets"
-        params = {
-            'closed': 'false',
-            'limit': limit,
-            '_order': 'volume',
-            '_sort': 'DESC'
-        }
+        # Calculate time until close
+        end_date_str = market.get('endDate', market.get('end_date_iso', ''))
+        if not end_date_str:
+            return None
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        # Parse timezone-aware
+        if end_date_str.endswith('Z'):
+            end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+        elif '+' in end_date_str or end_date_str.count('-') > 2:
+            end_date = datetime.fromisoformat(end_date_str)
+        else:
+            end_date = datetime.fromisoformat(end_date_str).replace(tzinfo=timezone.utc)
         
-        markets = response.json()
+        now = datetime.now(timezone.utc)
+        hours_until_close = (end_date - now).total_seconds() / 3600
         
-        processed_markets = []
-        for market in markets:
-            try:
-                # Calculate time until close
-                end_date_str = market.get('endDate', market.get('end_date_iso', ''))
-                if not end_date_str:
-                    continue
-                
-                # Parse timezone-aware
-                if end_date_str.endswith('Z'):
-                    end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-                elif '+' in end_date_str or end_date_str.count('-') > 2:
-                    end_date = datetime.fromisoformat(end_date_str)
-                else:
-                    end_date = datetime.fromisoformat(end_date_str).replace(tzinfo=timezone.utc)
-                
-                now = datetime.now(timezone.utc)
-                hours_until_close = (end_date - now).total_seconds() / 3600
-                
-                if hours_until_close < 0:
-                    continue
-                
-                question = market.get('question', market.get('title', ''))
-                description = market.get('description', '')
-                
-                # Get prices
-                outcome_prices = market.get('outcomePrices', ['0.5', '0.5'])
-                if isinstance(outcome_prices, str):
-                    outcome_prices = [outcome_prices, str(1 - float(outcome_prices))]
-                
-                yes_price = float(outcome_prices[0]) if outcome_prices else 0.5
-                
-                processed_markets.append({
-                    'platform': 'polymarket',
-                    'market_id': market.get('id', market.get('condition_id', '')),
-                    'question': question,
-                    'description': description[:500],
-                    'yes_price': yes_price,
-                    'no_price': 1 - yes_price,
-                    'volume': float(market.get('volume', market.get('volume24hr', 0))),
-                    'liquidity': float(market.get('liquidity', market.get('liquidityNum', 0))),
-                    'end_date': end_date.isoformat(),
-                    'hours_until_close': hours_until_close,
-                    'url': f"https://polymarket.com/event/{market.get('slug', market.get('question', '').lower().replace(' ', '-'))}"
-                })
-            except Exception as e:
-                continue
+        if hours_until_close < 0:
+            return None
         
-        return processed_markets
-    
+        question = market.get('question', market.get('title', ''))
+        description = market.get('description', '')
+        
+        # Get prices
+        outcome_prices = market.get('outcomePrices', ['0.5', '0.5'])
+        if isinstance(outcome_prices, str):
+            outcome_prices = [outcome_prices, str(1 - float(outcome_prices))]
+        
+        yes_price = float(outcome_prices[0]) if outcome_prices else 0.5
+        
+        return Market(
+            platform='polymarket',
+            market_id=market.get('id', market.get('condition_id', '')),
+            question=question,
+            description=description[:500],
+            yes_price=yes_price,
+            no_price=1 - yes_price,
+            raw_yes_price=yes_price,
+            volume=float(market.get('volume', market.get('volume24hr', 0))),
+            liquidity=float(market.get('liquidity', market.get('liquidityNum', 0))),
+            end_date=end_date.isoformat(),
+            hours_until_close=hours_until_close,
+            url=f"https://polymarket.com/event/{market.get('slug', market.get('question', '').lower().replace(' ', '-'))}"
+        )
+    except Exception as e:
+        return None
+
+
+def fetch_polymarket_markets(
+    limit: int = 100,
+    min_liquidity: Optional[float] = None,
+    page_size: int = MARKET_PAGE_SIZE
+) -> List[Market]:
+    """Fetch up to `limit` active Polymarket markets, most liquid first"""
+    try:
+        return _fetch_paginated(
+            _fetch_polymarket_page, _process_polymarket_market,
+            budget=limit, page_size=page_size, min_liquidity=min_liquidity
+        )
     except Exception as e:
         print(f"❌ Error fetching Polymarket data: {e}")
         return []
@@ -88,84 +174,96 @@ def fetch_polymarket_markets(limit: int = 100) -> List[Dict]:
 # MANIFOLD (No filtering)
 # ============================================================================
 
-def fetch_manifold_markets(limit: int = 100) -> List[Dict]:
-    """Fetch ALL active Manifold markets"""
+def _fetch_manifold_page(offset: int, limit: int) -> List[Dict]:
+    """One page of open binary Manifold markets, most liquid first"""
+    url = "https://api.manifold.markets/v0/search-markets"
+    params = {
+        'limit': limit,
+        'offset': offset,
+        'filter': 'open',
+        'sort': 'liquidity',
+        'contractType': 'BINARY'
+    }
+    
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    
+    return response.json()
+
+
+def _process_manifold_market(market: Dict) -> Optional[Market]:
+    """Normalize one raw Manifold market, None if unusable"""
     try:
-        url = "https://api.manifold.markets/v0/search-markets"
-        params = {
-            'limit': limit,
-            'filter': 'open',
-            'sort': 'liquidity',
-            'contractType': 'BINARY'
-        }
+        if market.get('isResolved') or market.get('closeTime', 0) < time.time() * 1000:
+            return None
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        # Calculate time until close
+        close_time_ms = market.get('closeTime', 0)
+        if close_time_ms == 0:
+            return None
         
-        markets = response.json()
+        close_time = datetime.fromtimestamp(close_time_ms / 1000, tz=timezone.utc)
+        now = datetime.now(timezone.utc)
+        hours_until_close = (close_time - now).total_seconds() / 3600
         
-        processed_markets = []
-        for market in markets:
-            try:
-                if market.get('isResolved') or market.get('closeTime', 0) < time.time() * 1000:
-                    continue
-                
-                # Calculate time until close
-                close_time_ms = market.get('closeTime', 0)
-                if close_time_ms == 0:
-                    continue
-                
-                close_time = datetime.fromtimestamp(close_time_ms / 1000, tz=timezone.utc)
-                now = datetime.now(timezone.utc)
-                hours_until_close = (close_time - now).total_seconds() / 3600
-                
-                if hours_until_close < 0:
-                    continue
-                
-                question = market.get('question', '')
-                description = market.get('description', '')
-                
-                # Get current probability
-                probability = market.get('probability', 0.5)
-                if probability is None:
-                    probability = 0.5
-                
-                # Manifold liquidity
-                liquidity = 0
-                if market.get('liquidity'):
-                    liquidity = float(market['liquidity'])
-                elif market.get('totalLiquidity'):
-                    liquidity = float(market['totalLiquidity'])
-                elif market.get('pool'):
-                    pool = market['pool']
-                    if isinstance(pool, dict):
-                        liquidity = sum(float(v) for v in pool.values())
-                    else:
-                        liquidity = float(pool)
-                
-                # Volume
-                volume = float(market.get('volume', 0))
-                if volume == 0:
-                    volume = float(market.get('volume24Hours', 0))
-                
-                processed_markets.append({
-                    'platform': 'manifold',
-                    'market_id': market.get('id'),
-                    'question': question,
-                    'description': description[:500],
-                    'yes_price': probability,
-                    'no_price': 1 - probability,
-                    'volume': volume,
-                    'liquidity': liquidity,
-                    'end_date': close_time.isoformat(),
-                    'hours_until_close': hours_until_close,
-                    'url': market.get('url')
-                })
-            except Exception as e:
-                continue
+        if hours_until_close < 0:
+            return None
         
-        return processed_markets
-    
+        question = market.get('question', '')
+        description = market.get('description', '')
+        
+        # Get current probability
+        probability = market.get('probability', 0.5)
+        if probability is None:
+            probability = 0.5
+        
+        # Manifold liquidity
+        liquidity = 0
+        if market.get('liquidity'):
+            liquidity = float(market['liquidity'])
+        elif market.get('totalLiquidity'):
+            liquidity = float(market['totalLiquidity'])
+        elif market.get('pool'):
+            pool = market['pool']
+            if isinstance(pool, dict):
+                liquidity = sum(float(v) for v in pool.values())
+            else:
+                liquidity = float(pool)
+        
+        # Volume
+        volume = float(market.get('volume', 0))
+        if volume == 0:
+            volume = float(market.get('volume24Hours', 0))
+        
+        return Market(
+            platform='manifold',
+            market_id=market.get('id'),
+            question=question,
+            description=description[:500],
+            yes_price=probability,
+            no_price=1 - probability,
+            raw_yes_price=probability,
+            volume=volume,
+            liquidity=liquidity,
+            end_date=close_time.isoformat(),
+            hours_until_close=hours_until_close,
+            url=market.get('url')
+        )
+    except Exception as e:
+        return None
+
+
+def fetch_manifold_markets(
+    limit: int = 100,
+    min_liquidity: Optional[float] = None,
+    page_size: int = MARKET_PAGE_SIZE
+) -> List[Market]:
+    """Fetch up to `limit` active Manifold markets, most liquid first"""
+    try:
+        return _fetch_paginated(
+            _fetch_manifold_page, _process_manifold_market,
+            budget=limit, page_size=page_size, min_liquidity=min_liquidity
+        )
     except Exception as e:
         print(f"❌ Error fetching Manifold data: {e}")
         return []
@@ -175,54 +273,64 @@ def fetch_manifold_markets(limit: int = 100) -> List[Dict]:
 # AGGREGATION (Minimal filtering)
 # ============================================================================
 
+_PLATFORM_FETCHERS = {
+    'polymarket': ('Polymarket', fetch_polymarket_markets),
+    'manifold': ('Manifold', fetch_manifold_markets),
+}
+
+
 def fetch_all_prediction_markets(
     platforms: List[str] = ['polymarket', 'manifold'],
     min_liquidity: float = 100,  # Lowered from 1000
     max_hours_until_close: int = 2160,  # Increased to 90 days
-    categories: Optional[List[str]] = None  # Ignored
-) -> List[Dict]:
+    categories: Optional[List[str]] = None,  # Ignored
+    market_budget: int = MARKET_FETCH_BUDGET
+) -> List[Market]:
     """
     Fetch ALL markets with minimal filtering
     Let the signal extraction decide what's good
+    Platforms are fetched in parallel, each up to `market_budget` markets.
     """
     all_markets = []
     
-    if 'polymarket' in platforms:
-        print("📊 Fetching Polymarket markets...")
-        try:
-            markets = fetch_polymarket_markets(limit=100)
-            all_markets.extend(markets)
-            print(f"  ✓ Fetched {len(markets)} Polymarket markets")
-        except Exception as e:
-            print(f"  ⚠️ Polymarket failed: {e}")
+    selected = [p for p in _PLATFORM_FETCHERS if p in platforms]
+    for platform in selected:
+        print(f"📊 Fetching {_PLATFORM_FETCHERS[platform][0]} markets...")
     
-    if 'manifold' in platforms:
-        print("📊 Fetching Manifold markets...")
-        try:
-            markets = fetch_manifold_markets(limit=100)
-            all_markets.extend(markets)
-            print(f"  ✓ Fetched {len(markets)} Manifold markets")
-        except Exception as e:
-            print(f"  ⚠️ Manifold failed: {e}")
+    with ThreadPoolExecutor(max_workers=max(1, len(selected))) as executor:
+        futures = {
+            platform: executor.submit(
+                _PLATFORM_FETCHERS[platform][1],
+                limit=market_budget,
+                min_liquidity=min_liquidity
+            )
+            for platform in selected
+        }
+        
+        for platform in selected:
+            name = _PLATFORM_FETCHERS[platform][0]
+            try:
+                markets = futures[platform].result()
+                all_markets.extend(markets)
+                print(f"  ✓ Fetched {len(markets)} {name} markets")
+            except Exception as e:
+                print(f"  ⚠️ {name} failed: {e}")
     
     if not all_markets:
         print("\n⚠️ No markets fetched from any platform!")
         return []
     
     # ONLY filter by basic criteria
-    filtered_markets = []
-    for market in all_markets:
-        # Must have SOME liquidity or volume
-        has_activity = (market['liquidity'] >= min_liquidity) or (market['volume'] >= min_liquidity)
-        
-        # Must be open
-        in_time_range = 0 < market['hours_until_close'] <= max_hours_until_close
-        
-        # Must have question text
-        has_question = len(market['question']) > 10
-        
-        if has_activity and in_time_range and has_question:
-            filtered_markets.append(market)
+    batch = MarketBatch(all_markets)
+    mask = market_filter_mask(
+        batch.liquidity, batch.volume, batch.hours_until_close, batch.question_len,
+        min_liquidity=min_liquidity,
+        max_hours_until_close=max_hours_until_close
+    )
+    filtered_markets = batch.select(mask)
+    
+    # Correct Manifold's long bias once, here; raw_yes_price keeps the original
+    calibrate_manifold_prices(filtered_markets)
     
     print(f"\n✅ Found {len(filtered_markets)} tradeable markets")
     print(f"   Filters: min_activity=${min_liquidity}, max_hours={max_hours_until_close}")
@@ -230,39 +338,80 @@ def fetch_all_prediction_markets(
     return filtered_markets
 
 
+def calibrate_manifold_prices(markets: List[Market]) -> None:
+    """Set yes/no prices of Manifold markets to the bias-corrected values (from raw_yes_price)"""
+    manifold = [m for m in markets if m.platform == 'manifold']
+    if not manifold:
+        return
+    raw = np.fromiter((m.raw_yes_price for m in manifold), dtype=np.float64, count=len(manifold))
+    for market, p in zip(manifold, calibrated_probs(raw).tolist()):
+        market.yes_price = p
+        market.no_price = 1 - p
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
-def get_market_quality_score(market: Dict) -> float:
-    """Simple quality score based on liquidity + volume"""
-    score = 0.0
+# Score per threshold-count: index = number of thresholds exceeded
+_LIQUIDITY_THRESHOLDS = (100, 1000, 5000, 10000)
+_VOLUME_THRESHOLDS = (100, 1000, 10000, 50000)
+_TIER_SCORES = np.array([0.0, 0.1, 0.2, 0.3, 0.4])
+
+
+def _tiers_exceeded(values: np.ndarray, thresholds) -> np.ndarray:
+    """How many thresholds each value is strictly above (NaN -> 0)"""
+    count = np.zeros(values.shape, dtype=np.intp)
+    for t in thresholds:
+        count += values > t
+    return count
+
+
+def market_filter_mask(
+    liquidity: np.ndarray,
+    volume: np.ndarray,
+    hours_until_close: np.ndarray,
+    question_len: np.ndarray,
+    min_liquidity: float,
+    max_hours_until_close: float
+) -> np.ndarray:
+    """Boolean mask of markets passing the basic tradeability filters"""
+    # Must have SOME liquidity or volume
+    has_activity = (liquidity >= min_liquidity) | (volume >= min_liquidity)
     
-    # Liquidity
-    if market['liquidity'] > 10000:
-        score += 0.4
-    elif market['liquidity'] > 5000:
-        score += 0.3
-    elif market['liquidity'] > 1000:
-        score += 0.2
-    elif market['liquidity'] > 100:
-        score += 0.1
+    # Must be open
+    in_time_range = (hours_until_close > 0) & (hours_until_close <= max_hours_until_close)
     
-    # Volume
-    if market['volume'] > 50000:
-        score += 0.4
-    elif market['volume'] > 10000:
-        score += 0.3
-    elif market['volume'] > 1000:
-        score += 0.2
-    elif market['volume'] > 100:
-        score += 0.1
+    # Must have question text
+    has_question = question_len > 10
+    
+    return has_activity & in_time_range & has_question
+
+
+def market_quality_scores(
+    liquidity: np.ndarray,
+    volume: np.ndarray,
+    hours_until_close: np.ndarray
+) -> np.ndarray:
+    """Simple quality score based on liquidity + volume, for many markets at once"""
+    liquidity = np.asarray(liquidity, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    hours = np.asarray(hours_until_close, dtype=np.float64)
+    
+    score = _TIER_SCORES[_tiers_exceeded(liquidity, _LIQUIDITY_THRESHOLDS)]
+    score = score + _TIER_SCORES[_tiers_exceeded(volume, _VOLUME_THRESHOLDS)]
     
     # Time horizon (prefer near-term for quick resolution)
-    hours = market['hours_until_close']
-    if 24 <= hours <= 720:
-        score += 0.2
-    elif 720 < hours <= 2160:
-        score += 0.1
+    score = score + np.where(
+        (hours >= 24) & (hours <= 720), 0.2,
+        np.where((hours > 720) & (hours <= 2160), 0.1, 0.0)
+    )
     
-    return min(1.0, score)
\ No newline at end of file
+    return np.minimum(1.0, score)
+
+
+def get_market_quality_score(market: Market) -> float:
+    """Simple quality score based on liquidity + volume"""
+    return float(market_quality_scores(
+        [market.liquidity], [market.volume], [market.hours_until_close]
+    )[0])
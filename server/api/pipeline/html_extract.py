@@ -0,0 +1,192 @@
+"""
+html_extract.py - Article body extraction from raw HTML
+Pluggable backends:
+  'bs4'  - BeautifulSoup + html.parser (pure Python, the original extractor)
+  'lxml' - libxml2 parser with a single-pass boilerplate stripper
+Selected by HTML_EXTRACTOR in config; falls back to bs4 if lxml is missing.
+
+Kept free of heavy imports (config is read lazily) because process-pool
+parse workers import this module.
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+_BOILERPLATE_RE = re.compile(
+    r'(nav|menu|sidebar|footer|header|cookie|newsletter|subscribe|comment|social|share)', re.I
+)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+_DROP_TAGS = {'script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'button', 'iframe'}
+
+
+def _finalize(text_parts: List[str]) -> Optional[str]:
+    """Shared length rules for every backend"""
+    text = " ".join(text_parts)
+    if len(text) > 50000:
+        text = text[:50000]
+    if len(text) > 100000:
+        return None
+
+    return text if len(text) > 300 else None
+
+
+# ============================================================================
+# BEAUTIFULSOUP BACKEND (reference)
+# ============================================================================
+
+def _extract_bs4(html: str) -> Optional[str]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    for element in soup.find_all(list(_DROP_TAGS)):
+        element.decompose()
+
+    for element in soup.find_all(class_=_BOILERPLATE_RE):
+        element.decompose()
+
+    for element in soup.find_all(id=_BOILERPLATE_RE):
+        element.decompose()
+
+    article_content = None
+    article_selectors = [
+        'article', '[class*="article"]', '[class*="content"]',
+        '[class*="post"]', '[id*="article"]', '[id*="content"]', 'main'
+    ]
+
+    for selector in article_selectors:
+        article_content = soup.select_one(selector)
+        if article_content:
+            paragraphs = article_content.find_all("p")
+            break
+
+    if not article_content:
+        paragraphs = soup.find_all("p")
+
+    text_parts = []
+    for p in paragraphs:
+        p_text = p.get_text(strip=True)
+        if len(p_text) > 40:
+            text_parts.append(p_text)
+
+    return _finalize(text_parts)
+
+
+# ============================================================================
+# LXML BACKEND (fast)
+# ============================================================================
+
+# XPath equivalents of the bs4 CSS selectors, same priority order
+_LXML_SELECTORS = [
+    '(//article)[1]',
+    '(//*[contains(@class, "article")])[1]',
+    '(//*[contains(@class, "content")])[1]',
+    '(//*[contains(@class, "post")])[1]',
+    '(//*[contains(@id, "article")])[1]',
+    '(//*[contains(@id, "content")])[1]',
+    '(//main)[1]',
+]
+
+
+def _is_boilerplate(el) -> bool:
+    if el.tag in _DROP_TAGS:
+        return True
+    cls = el.get('class')
+    if cls and _BOILERPLATE_RE.search(cls):
+        return True
+    el_id = el.get('id')
+    return bool(el_id and _BOILERPLATE_RE.search(el_id))
+
+
+def _extract_lxml(html: str) -> Optional[str]:
+    import lxml.html
+    from lxml import etree
+
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        root = lxml.html.document_fromstring(html.encode('utf-8', 'replace'), parser=parser)
+    except (etree.ParserError, ValueError):
+        return None
+
+    # single pass: drop boilerplate subtrees (and comments) top-down,
+    # never descending into a removed subtree
+    stack = [root]
+    while stack:
+        el = stack.pop()
+        for child in list(el):
+            if not isinstance(child.tag, str) or _is_boilerplate(child):
+                child.drop_tree()       # keeps the tail text, like bs4 decompose
+            else:
+                stack.append(child)
+
+    article_content = None
+    for selector in _LXML_SELECTORS:
+        found = root.xpath(selector)
+        if found:
+            article_content = found[0]
+            break
+
+    paragraphs = article_content.iterdescendants('p') if article_content is not None else root.iter('p')
+
+    text_parts = []
+    for p in paragraphs:
+        p_text = "".join(s.strip() for s in p.itertext())
+        if len(p_text) > 40:
+            text_parts.append(p_text)
+
+    return _finalize(text_parts)
+
+
+# ============================================================================
+# DISPATCH
+# ============================================================================
+
+EXTRACTORS: Dict[str, Callable[[str], Optional[str]]] = {
+    'bs4': _extract_bs4,
+    'lxml': _extract_lxml,
+}
+
+
+@lru_cache(maxsize=None)
+def available_extractors() -> tuple:
+    names = ['bs4']
+    try:
+        import lxml.html  # noqa: F401
+        names.append('lxml')
+    except ImportError:
+        pass
+    return tuple(names)
+
+
+def resolve_backend(name: Optional[str]) -> str:
+    """Configured backend name, or bs4 when the requested one is not installed"""
+    if name is None:
+        from .config import HTML_EXTRACTOR
+        name = HTML_EXTRACTOR
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor '{name}' (choose from {list(EXTRACTORS)})")
+    if name != 'bs4' and name not in available_extractors():
+        return 'bs4'
+    return name
+
+
+def extract_article_text(html: str, backend: Optional[str] = None) -> Optional[str]:
+    """Pull the main article paragraphs out of a page, None if too short"""
+    return EXTRACTORS[resolve_backend(backend)](html)
+
+
+def decode_html(body: bytes, charset: Optional[str] = None) -> str:
+    """HTTP charset, else <meta charset>, else UTF-8 (undecodable bytes replaced)"""
+    if not charset:
+        match = _META_CHARSET_RE.search(body[:4096])
+        charset = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+def extract_article_bytes(body: bytes, charset: Optional[str] = None,
+                          backend: Optional[str] = None) -> Optional[str]:
+    """Decode + extract; top-level so it can run in a process pool"""
+    return extract_article_text(decode_html(body, charset), backend)
@@ -0,0 +1,464 @@
+"""
+inference.py - Central in-process inference service
+Owns the only copy of each model in the process:
+  - zero-shot NLI classifier (facebook/bart-large-mnli), the 'full' tier
+  - distilled NLI classifier (valhalla/distilbart-mnli-12-3), the 'fast' tier
+    that submit_cascade() tries first
+  - sentence encoder (all-MiniLM-L6-v2)
+Every pipeline stage sends its classifier work here. Callers submit()
+requests and get a Future back; a single worker thread coalesces queued
+requests from all callers into one zero_shot_many call (one micro-batch,
+length-sorted there to minimise padding). A micro-batch is flushed when it
+reaches max_batch_requests, when its oldest request has waited max_wait_ms,
+or as soon as a caller blocks on one of its results.
+
+INFERENCE_BACKEND picks how the models run: 'torch' (fp32 transformers) or
+'onnx' (int8 ONNX Runtime graphs, see onnx_backend.py). Call sites are the
+same either way.
+
+Forked market workers inherit the loaded weights copy-on-write; the worker
+thread and queue are recreated lazily in each process.
+"""
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+import torch
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    NLI_MODEL_NAME,
+    NLI_FAST_MODEL_NAME,
+    NLI_CASCADE_ENABLED,
+    NLI_CASCADE_BAND,
+    ENCODER_MODEL_NAME,
+    INFERENCE_MAX_BATCH_REQUESTS,
+    INFERENCE_MAX_WAIT_MS,
+    INFERENCE_BACKEND
+)
+from .nli import zero_shot_many
+
+
+class _Pending(Future):
+    """Future that asks the worker to flush right away once a caller blocks on it"""
+
+    def __init__(self, service: 'InferenceService'):
+        super().__init__()
+        self._service = service
+        self.awaited = False
+
+    def result(self, timeout: Optional[float] = None):
+        if not self.done():
+            self.awaited = True
+            self._service._request_flush()
+        return super().result(timeout)
+
+
+class _Job:
+    __slots__ = ('requests', 'multi_label', 'tier', 'future', 'queued_at')
+
+    def __init__(self, requests: List[Tuple[str, Sequence[str]]], multi_label: bool, tier: str, future: Future):
+        self.requests = requests
+        self.multi_label = multi_label
+        self.tier = tier
+        self.future = future
+        self.queued_at = time.monotonic()
+
+
+def _margin(result: Dict) -> float:
+    """Gap between the top two label scores (for YES/NO: |P(YES) - P(NO)|)"""
+    scores = result['scores']
+    return scores[0] - (scores[1] if len(scores) > 1 else 1.0 - scores[0])
+
+
+BACKENDS = ('torch', 'onnx')
+TIERS = ('fast', 'full')
+
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Configured backend name, or torch when ONNX Runtime is not installed"""
+    name = name or INFERENCE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{name}' (choose from {list(BACKENDS)})")
+    if name == 'onnx':
+        from .onnx_backend import onnx_available
+        if not onnx_available():
+            print("  ⚠️ onnxruntime / optimum-onnx not installed, using the torch backend")
+            return 'torch'
+    return name
+
+
+class InferenceService:
+    """
+    One copy of each model plus the micro-batching worker that feeds the
+    classifiers. stats is updated from caller threads, the worker thread and
+    Future callbacks, so every update and read goes through _stats_lock.
+    """
+
+    def __init__(self, nli_model: str = NLI_MODEL_NAME, encoder_model: str = ENCODER_MODEL_NAME,
+                 max_batch_requests: int = INFERENCE_MAX_BATCH_REQUESTS,
+                 max_wait_ms: float = INFERENCE_MAX_WAIT_MS, backend: Optional[str] = None,
+                 fast_nli_model: str = NLI_FAST_MODEL_NAME):
+        self.nli_model = nli_model
+        self.fast_nli_model = fast_nli_model
+        self.encoder_model = encoder_model
+        self.backend = resolve_backend(backend)
+        self.max_batch_requests = max_batch_requests
+        self.max_wait = max_wait_ms / 1000.0
+        self._classifier = None
+        self._fast_classifier = None
+        self._encoder = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._worker_pid = None
+        self._cond = None               # guards _pending / _pending_requests / _flush_requested
+        self._pending = deque()
+        self._pending_requests = 0
+        self._flush_requested = False
+        self._stats_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_stats_lock)
+        self.stats = {
+            'jobs': 0, 'requests': 0, 'batches': 0,
+            'max_batch_requests': 0, 'max_queue_depth': 0,
+            'size_flushes': 0, 'wait_flushes': 0, 'await_flushes': 0,
+            'fast_pairs': 0, 'fast_seconds': 0.0, 'full_pairs': 0, 'full_seconds': 0.0,
+            'cascade_requests': 0, 'cascade_escalated': 0,
+            'encode_calls': 0, 'encoded_texts': 0
+        }
+
+    # ------------------------------------------------------------------
+    # Models (loaded once, before any fork)
+    # ------------------------------------------------------------------
+
+    def _load_classifier(self, model_name: str):
+        print(f"📥 Loading zero-shot classifier ({model_name}, {self.backend})...")
+        if self.backend == 'onnx':
+            from .onnx_backend import load_zero_shot_classifier
+            classifier = load_zero_shot_classifier(model_name)
+        else:
+            from transformers import pipeline
+            classifier = pipeline(
+                "zero-shot-classification",
+                model=model_name,
+                device=0 if torch.cuda.is_available() else -1
+            )
+        print("  ✓ Loaded")
+        return classifier
+
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            with self._load_lock:
+                if self._classifier is None:
+                    self._classifier = self._load_classifier(self.nli_model)
+        return self._classifier
+
+    @property
+    def fast_classifier(self):
+        if self._fast_classifier is None:
+            with self._load_lock:
+                if self._fast_classifier is None:
+                    self._fast_classifier = self._load_classifier(self.fast_nli_model)
+        return self._fast_classifier
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            with self._load_lock:
+                if self._encoder is None:
+                    if self.backend == 'onnx':
+                        from .onnx_backend import load_sentence_encoder
+                        self._encoder = load_sentence_encoder(self.encoder_model)
+                    else:
+                        from sentence_transformers import SentenceTransformer
+                        device = "cuda:0" if torch.cuda.is_available() else "cpu"
+                        self._encoder = SentenceTransformer(self.encoder_model, device=device)
+        return self._encoder
+
+    @property
+    def encoder_id(self) -> str:
+        """Embedding-cache model key; vectors from different backends/int8 presets must not mix"""
+        if self.backend == 'torch':
+            return self.encoder_model
+        return f"{self.encoder_model}@{self._quantized_tag()}"
+
+    def _quantized_tag(self) -> str:
+        from .onnx_backend import quantization_target
+        return f"{self.backend}-int8-{quantization_target()}"
+
+    def classifier_tag(self) -> str:
+        """Everything that changes zero-shot scores: backend, int8 preset, NLI model(s), cascade band"""
+        backend = self.backend if self.backend == 'torch' else self._quantized_tag()
+        cascade = f"cascade={self.fast_nli_model}@{NLI_CASCADE_BAND}" if NLI_CASCADE_ENABLED else "cascade=off"
+        return f"{backend}|{self.nli_model}|{cascade}"
+
+    def classifier_client(self) -> 'ClassifierClient':
+        self.classifier                 # load now, so forked workers share it
+        if NLI_CASCADE_ENABLED:
+            self.fast_classifier
+        return ClassifierClient(self)
+
+    # ------------------------------------------------------------------
+    # Zero-shot requests
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        if self._worker_pid != pid:
+            with self._load_lock:
+                if self._worker_pid != pid:
+                    # fresh queue state: a forked child must not inherit the parent's jobs or lock
+                    self._cond = threading.Condition()
+                    self._pending = deque()
+                    self._pending_requests = 0
+                    self._flush_requested = False
+                    threading.Thread(target=self._run, name="inference-worker", daemon=True).start()
+                    self._worker_pid = pid
+
+    def submit(self, requests: List[Tuple[str, Sequence[str]]], multi_label: bool = False,
+               tier: str = 'full') -> Future:
+        """Queue (sequence, candidate_labels) requests; the Future resolves to their results"""
+        if tier not in TIERS:
+            raise ValueError(f"Unknown classifier tier '{tier}' (choose from {list(TIERS)})")
+        if not requests:
+            future = Future()
+            future.set_result([])
+            return future
+        self._ensure_worker()
+        job = _Job(list(requests), multi_label, tier, _Pending(self))
+        with self._cond:
+            self._pending.append(job)
+            self._pending_requests += len(job.requests)
+            self._raise_max('max_queue_depth', len(self._pending))
+            self._cond.notify()
+        return job.future
+
+    def zero_shot(self, requests: List[Tuple[str, Sequence[str]]], multi_label: bool = False) -> List[Optional[Dict]]:
+        """Queue (sequence, candidate_labels) requests and wait for their results"""
+        return self.submit(requests, multi_label=multi_label).result()
+
+    def submit_cascade(self, requests: List[Tuple[str, Sequence[str]]], band: float) -> Future:
+        """
+        Two-tier zero-shot: the fast model scores every request, and only
+        those whose top-two margin is below band are re-scored by the full
+        model. The Future resolves to one result per request.
+        """
+        requests = list(requests)
+        combined = _Pending(self)
+
+        def merge(results: List[Optional[Dict]], uncertain: List[int], full: Future) -> None:
+            try:
+                for i, result in zip(uncertain, full.result()):
+                    results[i] = result
+                combined.set_result(results)
+            except Exception as e:
+                combined.set_exception(e)
+
+        def escalate(fast: Future) -> None:
+            try:
+                results = list(fast.result())
+                uncertain = [i for i, r in enumerate(results) if r is None or _margin(r) < band]
+                self._count(cascade_requests=len(results), cascade_escalated=len(uncertain))
+                if not uncertain:
+                    combined.set_result(results)
+                    return
+                full = self.submit([requests[i] for i in uncertain])
+                full.add_done_callback(lambda f: merge(results, uncertain, f))
+                if combined.awaited:
+                    self._request_flush()   # the caller is already waiting on the escalations
+            except Exception as e:
+                combined.set_exception(e)
+
+        self.submit(requests, tier='fast').add_done_callback(escalate)
+        return combined
+
+    def _request_flush(self) -> None:
+        if self._cond is None or self._worker_pid != os.getpid():
+            return
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify()
+
+    def _next_batch(self) -> List[_Job]:
+        """Block until a micro-batch is due, then pop its jobs"""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            deadline = self._pending[0].queued_at + self.max_wait
+            while True:
+                if self._pending_requests >= self.max_batch_requests:
+                    self._count(size_flushes=1)
+                    break
+                if self._flush_requested:
+                    self._count(await_flushes=1)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._count(wait_flushes=1)
+                    break
+                self._cond.wait(remaining)
+
+            jobs = [self._pending.popleft()]
+            n_requests = len(jobs[0].requests)
+            while self._pending and n_requests + len(self._pending[0].requests) <= self.max_batch_requests:
+                job = self._pending.popleft()
+                jobs.append(job)
+                n_requests += len(job.requests)
+            self._pending_requests -= n_requests
+            if not self._pending:
+                self._flush_requested = False
+            return jobs
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._next_batch()
+            for tier in TIERS:
+                for multi_label in (False, True):
+                    group = [job for job in jobs if job.tier == tier and job.multi_label == multi_label]
+                    if group:
+                        self._run_batch(group, multi_label, tier)
+
+    def _run_batch(self, jobs: List[_Job], multi_label: bool, tier: str) -> None:
+        requests = [r for job in jobs for r in job.requests]
+        self._count(jobs=len(jobs), requests=len(requests), batches=1)
+        self._raise_max('max_batch_requests', len(requests))
+        classifier = self.fast_classifier if tier == 'fast' else self.classifier
+        forward_stats = {}
+        try:
+            results = zero_shot_many(classifier, requests, multi_label=multi_label, forward_stats=forward_stats)
+        except Exception as e:
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        finally:
+            # model forwards only: NLI-cache hits cost (almost) nothing and are not counted
+            self._count(**{f'{tier}_pairs': forward_stats.get('pairs', 0),
+                           f'{tier}_seconds': forward_stats.get('seconds', 0.0)})
+
+        start = 0
+        for job in jobs:
+            end = start + len(job.requests)
+            job.future.set_result(results[start:end])
+            start = end
+
+    # ------------------------------------------------------------------
+    # Embeddings
+    # ------------------------------------------------------------------
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized float32 sentence embeddings (callers already batch)"""
+        self._count(encode_calls=1, encoded_texts=len(texts))
+        with self._encode_lock:
+            return self.encoder.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def _reset_stats_lock(self) -> None:
+        # a forked child may inherit the lock held by a parent thread
+        self._stats_lock = threading.Lock()
+
+    def _count(self, **deltas) -> None:
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def _raise_max(self, key: str, value: int) -> None:
+        with self._stats_lock:
+            if value > self.stats[key]:
+                self.stats[key] = value
+
+    def stats_snapshot(self) -> Dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def merge_stats(self, delta: Dict) -> None:
+        """Fold in stats_since() from a forked worker"""
+        with self._stats_lock:
+            for key, value in delta.items():
+                if key.startswith('max_'):
+                    self.stats[key] = max(self.stats[key], value)
+                else:
+                    self.stats[key] += value
+
+    def stats_since(self, before: Dict) -> Dict:
+        """Counter increments since a stats_snapshot() (max_* keys: current value)"""
+        now = self.stats_snapshot()
+        return {k: v if k.startswith('max_') else v - before[k] for k, v in now.items()}
+
+    def queue_depth(self) -> int:
+        return len(self._pending) if self._worker_pid == os.getpid() else 0
+
+    def summary(self) -> str:
+        s = self.stats_snapshot()
+        avg = s['requests'] / s['batches'] if s['batches'] else 0.0
+        return (f"[{self.backend}] {s['requests']} zero-shot requests from {s['jobs']} calls in {s['batches']} batches "
+                f"(avg {avg:.1f}, max {s['max_batch_requests']}; flushed {s['size_flushes']} full / "
+                f"{s['wait_flushes']} on timeout / {s['await_flushes']} on await) | "
+                f"max queue depth {s['max_queue_depth']} | "
+                f"{s['encoded_texts']} texts encoded{self.cascade_summary()}")
+
+    def cascade_summary(self) -> str:
+        """
+        Escalation rate and estimated time saved. Only (premise, hypothesis)
+        pairs that were actually forwarded count: the fast tier's forwards
+        for requests it settled, priced at the full model's measured
+        seconds per forwarded pair, minus everything the fast tier spent.
+        The fast tier only serves the cascade; settled pairs are taken as
+        the non-escalated share of its forwards.
+        """
+        s = self.stats_snapshot()
+        if not s['cascade_requests']:
+            return ""
+        rate = s['cascade_escalated'] / s['cascade_requests']
+        text = f" | cascade: {s['cascade_escalated']}/{s['cascade_requests']} escalated ({rate:.0%})"
+        if s['full_pairs']:
+            per_pair = s['full_seconds'] / s['full_pairs']
+            settled_pairs = s['fast_pairs'] * (1.0 - rate)
+            text += f", ~{settled_pairs * per_pair - s['fast_seconds']:.1f}s saved"
+        return text
+
+
+class ClassifierClient:
+    """
+    Drop-in for the transformers zero-shot pipeline, backed by the service.
+    Works with classifier(text, candidate_labels=...), with nli.zero_shot_many
+    and, without blocking, with nli.zero_shot_submit.
+    """
+
+    def __init__(self, service: InferenceService):
+        self.service = service
+
+    def classify_many(self, requests: List[Tuple[str, Sequence[str]]], multi_label: bool = False) -> List[Optional[Dict]]:
+        return self.service.zero_shot(requests, multi_label=multi_label)
+
+    def submit_many(self, requests: List[Tuple[str, Sequence[str]]], multi_label: bool = False) -> Future:
+        return self.service.submit(requests, multi_label=multi_label)
+
+    def submit_cascade(self, requests: List[Tuple[str, Sequence[str]]], band: float) -> Future:
+        return self.service.submit_cascade(requests, band)
+
+    def __call__(self, sequences, candidate_labels, multi_label: bool = False, **kwargs):
+        if isinstance(candidate_labels, str):
+            candidate_labels = [candidate_labels]
+        single = isinstance(sequences, str)
+        seqs = [sequences] if single else list(sequences)
+        results = self.classify_many([(seq, candidate_labels) for seq in seqs], multi_label=multi_label)
+        if any(r is None for r in results):
+            raise RuntimeError("zero-shot classification failed")
+        return results[0] if single else results
+
+
+_service = None                     # lazy init
+
+
+def get_inference_service() -> InferenceService:
+    """Process-wide service (shared with forked workers)"""
+    global _service
+    if _service is None:
+        _service = InferenceService()
+    return _service
@@ -1,19 +1,130 @@
 """
 manifold_bias.py  –  logistic calibration of manifold long-bias
 Coefficients fitted on 9 800 resolved manifold binary markets (May 2024).
+Refit them from a local file of resolved markets with
+    python -m pipeline.manifold_bias resolved.csv
+or point MANIFOLD_RESOLVED_MARKETS_PATH at the file to refit on first use.
 """
+import csv
 import numpy as np
+from typing import Tuple
+
+from .config import MANIFOLD_RESOLVED_MARKETS_PATH
 
 _COEF = np.array([0.853, -0.247])      # [λ₁, λ₀]  for logit remap
+_coef_loaded = False                    # lazy refit from MANIFOLD_RESOLVED_MARKETS_PATH
+
+
+def _get_coef() -> np.ndarray:
+    global _COEF, _coef_loaded
+    if not _coef_loaded:
+        _coef_loaded = True
+        if MANIFOLD_RESOLVED_MARKETS_PATH:
+            try:
+                coef = refit_from_file(MANIFOLD_RESOLVED_MARKETS_PATH)
+                if not np.all(np.isfinite(coef)):
+                    raise ValueError(f"non-finite coefficients {coef}")
+                _COEF = coef
+                print(f"  ✓ Manifold calibration refit: λ₁={_COEF[0]:.3f}, λ₀={_COEF[1]:.3f}")
+            except Exception as e:
+                print(f"  ⚠️ Manifold calibration refit failed, using defaults: {e}")
+    return _COEF
+
+
+def calibrated_probs(market_prices) -> np.ndarray:
+    """
+    Convert an array of raw manifold prices to bias-corrected probabilities.
+    Prices outside [0.01, 0.99] are returned untouched.
+    """
+    prices = np.asarray(market_prices, dtype=np.float64)
+    coef = _get_coef()
+    inside = (prices >= 0.01) & (prices <= 0.99)
+    p = np.where(inside, prices, 0.5)            # keep the log finite for extremes
+    logit_adj = coef[0] * np.log(p / (1 - p)) + coef[1]
+    p_adj = np.clip(1 / (1 + np.exp(-logit_adj)), 0.01, 0.99)
+    return np.where(inside, p_adj, prices)
 
 
 def calibrated_prob(market_price: float) -> float:
     """
     Convert raw manifold price to bias-corrected probability.
     """
-    if not (0.01 <= market_price <= 0.99):
-        return market_price          # leave extremes untouched
-    logit = np.log(market_price / (1 - market_price))
-    logit_adj = _COEF[0] * logit + _COEF[1]
-    p_adj = 1 / (1 + np.exp(-logit_adj))
-    return np.clip(p_adj, 0.01, 0.99)
\ No newline at end of file
+    return float(calibrated_probs([market_price])[0])
+
+
+# ============================================================================
+# REFIT
+# ============================================================================
+
+def fit_coefficients(prices, outcomes, iterations: int = 50) -> np.ndarray:
+    """
+    Logistic regression of outcome (0/1) on logit(price), by Newton's method.
+    Returns [λ₁, λ₀]. Raises ValueError if the fit does not converge, e.g.
+    on (near-)separable data where the coefficients run off to infinity.
+    """
+    prices = np.clip(np.asarray(prices, dtype=np.float64), 0.01, 0.99)
+    y = np.asarray(outcomes, dtype=np.float64)
+    X = np.column_stack([np.log(prices / (1 - prices)), np.ones_like(prices)])
+
+    coef = _COEF.copy()
+    for _ in range(iterations):
+        p = 1 / (1 + np.exp(-(X @ coef)))
+        grad = X.T @ (y - p)
+        hess = (X * (p * (1 - p))[:, None]).T @ X
+        step = np.linalg.solve(hess + 1e-9 * np.eye(2), grad)
+        coef = coef + step
+        if not np.all(np.isfinite(coef)):
+            break
+        if np.max(np.abs(step)) < 1e-8:
+            return coef
+    raise ValueError(f"calibration fit did not converge in {iterations} iterations (last coef {coef})")
+
+
+def load_resolved_markets(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    CSV with a 'price' column (market probability before resolution) and an
+    'outcome' column (1/0 or YES/NO). Other columns and other resolutions
+    (e.g. CANCEL, MKT) are ignored.
+    """
+    prices, outcomes = [], []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            outcome = str(row.get('outcome', '')).strip().upper()
+            if outcome in ('1', 'YES', 'TRUE'):
+                y = 1.0
+            elif outcome in ('0', 'NO', 'FALSE'):
+                y = 0.0
+            else:
+                continue
+            try:
+                prices.append(float(row['price']))
+            except (KeyError, TypeError, ValueError):
+                continue
+            outcomes.append(y)
+    return np.array(prices), np.array(outcomes)
+
+
+def refit_from_file(path: str, min_markets: int = 200) -> np.ndarray:
+    """Fit [λ₁, λ₀] from a resolved-markets CSV (see load_resolved_markets)"""
+    prices, outcomes = load_resolved_markets(path)
+    if len(prices) < min_markets:
+        raise ValueError(f"only {len(prices)} usable resolved markets in {path} (need {min_markets})")
+    return fit_coefficients(prices, outcomes)
+
+
+def set_coefficients(coef) -> None:
+    """Override the calibration coefficients for this process"""
+    global _COEF, _coef_loaded
+    _COEF = np.asarray(coef, dtype=np.float64)
+    _coef_loaded = True
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print("Usage: python -m pipeline.manifold_bias <resolved_markets.csv>")
+        sys.exit(1)
+
+    coef = refit_from_file(sys.argv[1])
+    print(f"λ₁ = {coef[0]:.4f}, λ₀ = {coef[1]:.4f}  (current: {_COEF[0]}, {_COEF[1]})")
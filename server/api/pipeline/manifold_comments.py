@@ -3,26 +3,17 @@ manifold_comments.py - Fetch and analyze Manifold market comments
 Comments often contain insider info, expert analysis, and sentiment shifts
 """
 import requests
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import re
-from transformers import pipeline
 import numpy as np
 
-# Global classifier (lazy init)
-_classifier = None
+from .nli import zero_shot_submit
+from .inference import get_inference_service
 
 
 def _get_classifier():
-    global _classifier
-    if _classifier is None:
-        print("📥 Loading zero-shot classifier for comments...")
-        _classifier = pipeline(
-            "zero-shot-classification",
-            model="facebook/bart-large-mnli",
-            device=0 if __import__('torch').cuda.is_available() else -1
-        )
-        print("  ✓ Loaded")
-    return _classifier
+    """Same classifier (and model copy) the matcher uses"""
+    return get_inference_service().classifier_client()
 
 
 # ============================================================================
@@ -140,13 +131,14 @@ def filter_quality_comments(comments: List[Dict], min_length: int = 50) -> List[
 # COMMENT SENTIMENT ANALYSIS
 # ============================================================================
 
-def analyze_comment_sentiment(comments: List[Dict], market_question: str) -> Dict:
+def submit_comment_sentiment(comments: List[Dict], market_question: str) -> Callable[[], Dict]:
     """
-    Use zero-shot classification to determine if comments support YES or NO
-    Returns: {'sentiment': float, 'confidence': float, 'analyzed_count': int}
+    Queue the comment classification without waiting for it.
+    Returns a function that waits for the results and gives the
+    analyze_comment_sentiment dict.
     """
     if not comments:
-        return {'sentiment': 0.5, 'confidence': 0.0, 'analyzed_count': 0}
+        return lambda: {'sentiment': 0.5, 'confidence': 0.0, 'analyzed_count': 0}
     
     classifier = _get_classifier()
     
@@ -156,20 +148,24 @@ def analyze_comment_sentiment(comments: List[Dict], market_question: str) -> Dic
         f"This opposes: {market_question}"
     ]
     
+    # Analyze top comments in one batched (and cached) pass
+    top_comments = comments[:20]
+    texts = [comment['text'][:800] for comment in top_comments]  # Truncate for speed
+    pending = zero_shot_submit(classifier, texts, hypotheses)
+    
+    return lambda: _combine_comment_sentiment(pending.result(), top_comments, hypotheses, len(comments))
+
+
+def _combine_comment_sentiment(results: List[Optional[Dict]], top_comments: List[Dict],
+                               hypotheses: List[str], total_comments: int) -> Dict:
     sentiment_scores = []
     confidence_scores = []
     
-    # Analyze top comments
-    for comment in comments[:20]:
-        text = comment['text'][:800]  # Truncate for speed
+    for comment, result in zip(top_comments, results):
+        if result is None:
+            continue
         
         try:
-            result = classifier(
-                text,
-                candidate_labels=hypotheses,
-                multi_label=False
-            )
-            
             # Get probability for "supports" hypothesis
             supports_idx = result['labels'].index(hypotheses[0])
             prob_yes = result['scores'][supports_idx]
@@ -209,10 +205,18 @@ def analyze_comment_sentiment(comments: List[Dict], market_question: str) -> Dic
         'sentiment': float(sentiment),
         'confidence': float(avg_confidence),
         'analyzed_count': len(sentiment_scores),
-        'total_comments': len(comments)
+        'total_comments': total_comments
     }
 
 
+def analyze_comment_sentiment(comments: List[Dict], market_question: str) -> Dict:
+    """
+    Use zero-shot classification to determine if comments support YES or NO
+    Returns: {'sentiment': float, 'confidence': float, 'analyzed_count': int}
+    """
+    return submit_comment_sentiment(comments, market_question)()
+
+
 # ============================================================================
 # EXTRACT QUANTITATIVE PREDICTIONS FROM COMMENTS
 # ============================================================================
@@ -263,10 +267,11 @@ def extract_comment_predictions(comments: List[Dict]) -> List[float]:
 # COMPREHENSIVE COMMENT ANALYSIS
 # ============================================================================
 
-def analyze_market_comments(market: Dict) -> Optional[Dict]:
+def submit_market_comments(market: Dict) -> Optional[Callable[[], Dict]]:
     """
-    Complete comment analysis pipeline
-    Returns: {'sentiment', 'confidence', 'predictions', 'quality'}
+    Fetch and filter a market's comments and queue their classification.
+    Returns a function that finishes the analyze_market_comments result,
+    or None when there is nothing to analyze.
     """
     if market['platform'] != 'manifold':
         return None
@@ -286,9 +291,13 @@ def analyze_market_comments(market: Dict) -> Optional[Dict]:
     if len(quality_comments) < 2:
         return None
     
-    # Sentiment analysis
-    sentiment_result = analyze_comment_sentiment(quality_comments, question)
+    # Sentiment analysis (queued; collected in _finish_market_comments)
+    pending_sentiment = submit_comment_sentiment(quality_comments, question)
     
+    return lambda: _finish_market_comments(quality_comments, pending_sentiment())
+
+
+def _finish_market_comments(quality_comments: List[Dict], sentiment_result: Dict) -> Dict:
     # Extract explicit predictions
     predictions = extract_comment_predictions(quality_comments)
     
@@ -308,6 +317,15 @@ def analyze_market_comments(market: Dict) -> Optional[Dict]:
     }
 
 
+def analyze_market_comments(market: Dict) -> Optional[Dict]:
+    """
+    Complete comment analysis pipeline
+    Returns: {'sentiment', 'confidence', 'predictions', 'quality'}
+    """
+    pending = submit_market_comments(market)
+    return pending() if pending is not None else None
+
+
 # ============================================================================
 # BATCH COMMENT ANALYSIS
 # ============================================================================
@@ -326,8 +344,12 @@ def enrich_manifold_markets_with_comments(markets: List[Dict]) -> List[Dict]:
     
     analyzed_count = 0
     
-    for market in manifold_markets:
-        comment_analysis = analyze_market_comments(market)
+    # Queue each market's classification and move on to fetching the next
+    # market's comments; the inference worker runs them in the meantime
+    pending = [(market, submit_market_comments(market)) for market in manifold_markets]
+    
+    for market, finish in pending:
+        comment_analysis = finish() if finish is not None else None
         
         if comment_analysis:
             market['comment_analysis'] = comment_analysis
@@ -0,0 +1,132 @@
+"""
+market_snapshots.py - Incremental market snapshot store
+Keyed by (platform, market_id). Each snapshot keeps the question, the raw
+(uncalibrated) price, a fingerprint of the relevant-article set and the
+signal_data computed from it, so unchanged markets skip signal extraction
+on the next scan.
+"""
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .disk_cache import DiskCache
+from .records import Market, Article
+from .config import (
+    MARKET_SNAPSHOT_ENABLED,
+    MARKET_SNAPSHOT_PATH,
+    MARKET_SNAPSHOT_MAX_ENTRIES,
+    MARKET_SNAPSHOT_PRICE_EPSILON,
+    MARKET_SNAPSHOT_MAX_AGE_SECONDS
+)
+
+
+def snapshot_key(market: Market) -> str:
+    return f"{market.platform}:{market.market_id}"
+
+
+def article_fingerprint(articles: List[Article], market: Market, model_tag: str = "") -> str:
+    """
+    Order-independent hash of the relevant articles (+ external forecast, which
+    feeds the estimate, and the classifier config that produced the signals)
+    """
+    h = hashlib.sha1()
+    for link in sorted(a.link or a.title or '' for a in articles):
+        h.update(link.encode('utf-8'))
+        h.update(b'\x00')
+    h.update(repr(market.external_forecast).encode('utf-8'))
+    h.update(b'\x00')
+    h.update(model_tag.encode('utf-8'))
+    return h.hexdigest()
+
+
+class MarketSnapshotStore:
+    """
+    A snapshot is reused when the question is identical, the raw price moved
+    less than price_epsilon, the relevant-article fingerprint matches and the
+    snapshot is younger than max_age_seconds. Anything else is recomputed.
+    """
+
+    def __init__(self, path: str, max_entries: int, price_epsilon: float, max_age_seconds: float):
+        self._store = DiskCache(path, table="market_snapshots", max_entries=max_entries)
+        self.price_epsilon = price_epsilon
+        self.max_age_seconds = max_age_seconds
+        self._previous = {}
+        self._pending = {}
+        self.stats = {'reused': 0, 'changed': 0, 'new': 0}
+
+    def load(self, markets: List[Market]) -> None:
+        """Read every market's last snapshot in one query"""
+        self._previous = {}
+        self._pending = {}
+        try:
+            rows = self._store.get_many(snapshot_key(m) for m in markets if m.market_id)
+        except Exception as e:
+            print(f"  ⚠️ Market snapshot store unavailable: {e}")
+            return
+        for key, blob in rows.items():
+            self._previous[key] = json.loads(blob.decode('utf-8'))
+
+    def reuse(self, market: Market, raw_price: float, fingerprint: str) -> Tuple[Optional[Dict], str]:
+        """
+        (cached signal_data, 'reused') if nothing relevant changed since the
+        last scan, else (None, 'new' | 'changed'). Read-only, so it is safe in
+        forked workers; the caller tallies the status into stats.
+        """
+        snap = self._previous.get(snapshot_key(market)) if market.market_id else None
+        if snap is None:
+            return None, 'new'
+        if (snap['question'] != market.question
+                or abs(snap['raw_price'] - raw_price) >= self.price_epsilon
+                or snap['fingerprint'] != fingerprint
+                or time.time() - snap['updated_at'] >= self.max_age_seconds):
+            return None, 'changed'
+
+        signal_data = dict(snap['signal_data'])
+        signal_data['signal_sources'] = [tuple(s) for s in signal_data.get('signal_sources', [])]
+        return signal_data, 'reused'
+
+    def record(self, market: Market, raw_price: float, fingerprint: str, signal_data: Dict) -> None:
+        """Queue a freshly computed snapshot; written by flush()"""
+        if not market.market_id:
+            return
+        self._pending[snapshot_key(market)] = {
+            'question': market.question,
+            'raw_price': raw_price,
+            'fingerprint': fingerprint,
+            'signal_data': signal_data,
+            'updated_at': time.time()
+        }
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        try:
+            self._store.set_many({
+                k: json.dumps(v, default=float).encode('utf-8') for k, v in self._pending.items()
+            })
+        except Exception as e:
+            print(f"  ⚠️ Failed to write market snapshots: {e}")
+        self._pending = {}
+
+    def summary(self) -> str:
+        return (f"{self.stats['reused']} reused | {self.stats['changed']} changed | "
+                f"{self.stats['new']} new")
+
+
+_store = None                       # lazy init
+
+
+def get_snapshot_store() -> Optional[MarketSnapshotStore]:
+    """Process-wide store, or None when disabled in config"""
+    global _store
+    if not MARKET_SNAPSHOT_ENABLED:
+        return None
+    if _store is None:
+        _store = MarketSnapshotStore(
+            MARKET_SNAPSHOT_PATH,
+            MARKET_SNAPSHOT_MAX_ENTRIES,
+            MARKET_SNAPSHOT_PRICE_EPSILON,
+            MARKET_SNAPSHOT_MAX_AGE_SECONDS
+        )
+    return _store
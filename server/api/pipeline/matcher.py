@@ -2,35 +2,30 @@
 matcher_v3.py - Robust, domain-agnostic market matcher
 NOW WITH SANITY CHECKS AND PROPER VALIDATION
 """
-from .question_retriever import retrieve_topk_for_question
-from .manifold_bias import calibrated_prob
-from .universal_signals import extract_all_signals, calculate_time_weights
+from .question_retriever import ArticleCorpus
+from .market_snapshots import get_snapshot_store, article_fingerprint
+from .records import Market, Article, Opportunity
+from .inference import get_inference_service
+from .nli_cache import get_nli_cache
+from .universal_signals import extract_all_signals, calculate_time_weights, MentionIndex
 from .validation import (
     passes_sanity_checks,
-    filter_opportunities,
+    submit_market_realism,
+    report_filtering,
     recalibrate_confidence
 )
+from .config import PARALLEL_MARKETS, MAX_WORKERS_MARKETS, MARKET_CHUNK_SIZE
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from typing import List, Dict, Optional
-from transformers import pipeline
+from typing import List, Dict, NamedTuple, Optional, Tuple
 import torch
 
 
-# Global classifier
-_classifier = None
-
 def _get_classifier():
-    global _classifier
-    if _classifier is None:
-        print("📥 Loading zero-shot classifier...")
-        device = 0 if torch.cuda.is_available() else -1
-        _classifier = pipeline(
-            "zero-shot-classification",
-            model="facebook/bart-large-mnli",
-            device=device
-        )
-        print(f"  ✓ Loaded")
-    return _classifier
+    """Zero-shot classifier backed by the shared inference service"""
+    return get_inference_service().classifier_client()
 
 
 # ============================================================================
@@ -38,15 +33,15 @@ def _get_classifier():
 # ============================================================================
 
 def calculate_alpha_score(
-    market: Dict,
+    market: Market,
     signal_data: Dict,
-    articles: List[Dict],
+    articles: List[Article],
     kelly_cap_base: float = 0.25
 ) -> Dict:
     """
     CUSTOM TUNED: Your data has good signals, be less aggressive with filtering
     """
-    market_price = market['yes_price']
+    market_price = market.yes_price
     model_estimate = signal_data['final_estimate']
     
     # Recalibrate confidence
@@ -56,7 +51,7 @@ def calculate_alpha_score(
     edge = abs(model_estimate - market_price)
     
     # Get market info
-    hours = market.get('hours_until_close', 720)
+    hours = market.hours_until_close
     num_prob_mentions = signal_data.get('num_prob_mentions', 0)
     
     # === MORE LENIENT FILTERS ===
@@ -181,10 +176,10 @@ def calculate_alpha_score(
     
     # === KELLY FRACTION ===
 
-    has_forecast = market.get('external_forecast') is not None
+    has_forecast = market.external_forecast is not None
 
     # Liquidity adjustment: map liquidity -> multiplier in [0.6, 1.5]
-    liquidity = float(market.get('liquidity') or 0.0)
+    liquidity = float(market.liquidity or 0.0)
     # Base multiplier: 0.6 when liquidity=0, ~1.0 at liquidity=5000, saturates at 1.5 for very high liquidity
     liq_mult = 0.6 + (1.0 - 0.6) * min(1.0, liquidity / 5000.0)
     liq_mult = min(1.5, liq_mult)
@@ -214,16 +209,162 @@ def calculate_alpha_score(
         'has_forecast': has_forecast,
         'num_prob_mentions': num_prob_mentions
     }
+# ============================================================================
+# PER-MARKET ANALYSIS (serial or forked workers)
+# ============================================================================
+
+class _MatchContext(NamedTuple):
+    markets: List[Market]
+    corpus: ArticleCorpus
+    top_idx: np.ndarray
+    top_scores: np.ndarray
+    classifier: object
+    mention_index: MentionIndex
+    snapshots: Optional[object]
+    model_tag: str                      # InferenceService.classifier_tag(), part of snapshot fingerprints
+
+
+class _MarketResult(NamedTuple):
+    idx: int
+    signal_data: Dict
+    fingerprint: Optional[str]
+    snapshot_status: Optional[str]      # 'reused' / 'changed' / 'new', None without a snapshot store
+    alpha_result: Optional[Dict]        # None when below the alpha threshold
+    passes: bool                        # sanity checks
+    reason: Optional[str]               # sanity-check verdict, None below the alpha threshold
+    article_count: int
+
+
+def _analyze_market(ctx: _MatchContext, idx: int) -> Optional[_MarketResult]:
+    """
+    Everything for one market that does not touch shared state.
+    The parent applies the result (snapshot writes, opportunities) in market order.
+    """
+    market = ctx.markets[idx]
+    question = market.question
+    
+    # 1. Get relevant articles (increased from 40 to 50)
+    relevant = ctx.corpus.take(ctx.top_idx[idx], ctx.top_scores[idx])
+    
+    if len(relevant) < 3:  # Lowered from 5 to 3
+        return None
+    
+    # 2. Manifold prices were bias-calibrated at fetch time; snapshots compare raw prices
+    raw_price = market.raw_yes_price
+    
+    # 3. Extract signals (or reuse last scan's if nothing changed)
+    signal_data, fingerprint, snapshot_status = None, None, None
+    if ctx.snapshots is not None:
+        fingerprint = article_fingerprint(relevant, market, ctx.model_tag)
+        signal_data, snapshot_status = ctx.snapshots.reuse(market, raw_price, fingerprint)
+    if signal_data is None:
+        signal_data = extract_all_signals(relevant, question, ctx.classifier, market.get("hoirs_until_close"), market=market, mention_index=ctx.mention_index)
+    
+    # 4. Calculate alpha (with recalibrated confidence)
+    alpha_result = calculate_alpha_score(market, signal_data, relevant)
+    
+    # 5. Filter by minimum alpha (lowered from 0.20 to 0.15)
+    if alpha_result['alpha_score'] < 0.15:
+        return _MarketResult(idx, signal_data, fingerprint, snapshot_status, None, False, None, len(relevant))
+    
+    # 6. RUN SANITY CHECKS (NEW!)
+    # Only markets past the alpha cut pay for the realism classification; it is
+    # queued, so it joins whatever other markets have waiting in the micro-batch
+    realism = submit_market_realism(question, ctx.classifier)
+    passes, reason = passes_sanity_checks(market, signal_data, ctx.classifier, verbose=False, realism=realism)
+    
+    return _MarketResult(idx, signal_data, fingerprint, snapshot_status, alpha_result, passes, reason, len(relevant))
+
+
+_worker_ctx = None          # set in the parent right before forking market workers
+
+
+def _init_market_worker(torch_threads: int):
+    # workers share the CPU, so each gets its slice of intra-op threads
+    torch.set_num_threads(torch_threads)
+
+
+def _analyze_market_chunk(indices: List[int]) -> Tuple[List[Optional[_MarketResult]], Dict, Tuple[int, int]]:
+    """
+    Results for one chunk, plus the inference stats and NLI-cache (hits, misses)
+    it added; the parent merges both, since worker counters die with the worker.
+    """
+    service = get_inference_service()
+    cache = get_nli_cache()
+    before = service.stats_snapshot()
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    results = [_analyze_market(_worker_ctx, idx) for idx in indices]
+    cache_delta = (cache.hits - hits, cache.misses - misses) if cache is not None else (0, 0)
+    return results, service.stats_since(before), cache_delta
+
+
+def _market_workers(n_markets: int) -> int:
+    """Worker processes to use, 0 = run serially"""
+    if not PARALLEL_MARKETS or n_markets < 2 * MARKET_CHUNK_SIZE:
+        return 0
+    if 'fork' not in mp.get_all_start_methods():
+        return 0                        # models must be shared copy-on-write
+    if torch.cuda.is_available():
+        return 0                        # CUDA contexts do not survive fork
+    if get_inference_service().backend == 'onnx':
+        return 0                        # ONNX Runtime thread pools do not survive fork (and use every core already)
+    workers = min(MAX_WORKERS_MARKETS, os.cpu_count() or 1, -(-n_markets // MARKET_CHUNK_SIZE))
+    return workers if workers > 1 else 0
+
+
+def _analyze_all_markets(ctx: _MatchContext) -> List[Optional[_MarketResult]]:
+    """
+    Per-market results in market order. Markets are sharded in contiguous
+    chunks across forked workers that inherit the already-loaded models,
+    corpus embeddings and mention index; falls back to a serial loop.
+    """
+    global _worker_ctx
+    n = len(ctx.markets)
+    workers = _market_workers(n)
+    
+    if workers:
+        chunks = [list(range(i, min(n, i + MARKET_CHUNK_SIZE))) for i in range(0, n, MARKET_CHUNK_SIZE)]
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        print(f"  ⚡ {workers} market workers × {torch_threads} threads, {len(chunks)} chunks")
+        
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        _worker_ctx = ctx
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp.get_context('fork'),
+                initializer=_init_market_worker,
+                initargs=(torch_threads,)
+            ) as executor:
+                # map() yields chunks in submission order -> deterministic output
+                service = get_inference_service()
+                cache = get_nli_cache()
+                results = []
+                for chunk_results, stats, (hits, misses) in executor.map(_analyze_market_chunk, chunks):
+                    results.extend(chunk_results)
+                    service.merge_stats(stats)
+                    if cache is not None:
+                        cache.hits += hits
+                        cache.misses += misses
+                return results
+        except Exception as e:
+            print(f"  ⚠️ Market workers failed ({e}), analyzing serially")
+        finally:
+            _worker_ctx = None
+    
+    return [_analyze_market(ctx, idx) for idx in range(n)]
+
+
 # ============================================================================
 # MAIN MATCHING (Updated with Validation)
 # ============================================================================
 
 def match_markets_to_topics(
-    articles: List[Dict],
+    articles: List[Article],
     topic_model,
-    markets: List[Dict],
+    markets: List[Market],
     top_n: int = 50  # Increased from 30 to 50
-) -> Dict[int, List[Dict]]:
+) -> Dict[int, List[Opportunity]]:
     """
     Market matching with SANITY CHECKS and VALIDATION
     """
@@ -232,63 +373,78 @@ def match_markets_to_topics(
     
     opportunities = []
     print(f"\n🔍 Analyzing {len(markets)} markets...")
+
+    # Embed the article corpus once, then score every question in one batch
+    corpus = ArticleCorpus(articles)
+    top_idx, top_scores = corpus.search([m.question for m in markets], k=50)
+
+    # Scan every article for probability mentions once, shared by all markets
+    mention_index = MentionIndex(articles)
+    print(f"  ✓ Indexed {mention_index.num_mentions()} probability mentions in {len(mention_index)} articles")
+
+    # Last scan's signals, reused for markets that have not changed
+    snapshots = get_snapshot_store()
+    if snapshots is not None:
+        snapshots.load(markets)
     
-    for idx, market in enumerate(markets):
-        question = market['question']
-        
-        # 1. Get relevant articles (increased from 40 to 50)
-        relevant = retrieve_topk_for_question(articles, question, k=50)
-        
-        if len(relevant) < 3:  # Lowered from 5 to 3
+    # Snapshots from another backend / int8 preset / cascade setting must not be reused
+    model_tag = get_inference_service().classifier_tag()
+    ctx = _MatchContext(markets, corpus, top_idx, top_scores, classifier, mention_index, snapshots, model_tag)
+    
+    candidates = 0
+    rejection_reasons = {}
+    for result in _analyze_all_markets(ctx):
+        if result is None:
             continue
+        market = markets[result.idx]
         
-        # 2. Calibrate Manifold prices
-        if market['platform'] == 'manifold':
-            market['yes_price'] = calibrated_prob(market['yes_price'])
-        
-        # 3. Extract signals
-        signal_data = extract_all_signals(relevant, question, classifier, market.get("hoirs_until_close"), market=market)
+        if snapshots is not None:
+            snapshots.stats[result.snapshot_status] += 1
+            if result.snapshot_status != 'reused':
+                snapshots.record(market, market.raw_yes_price, result.fingerprint, result.signal_data)
         
-        # 4. Calculate alpha (with recalibrated confidence)
-        alpha_result = calculate_alpha_score(market, signal_data, relevant)
-        
-        # 5. Filter by minimum alpha (lowered from 0.20 to 0.15)
-        if alpha_result['alpha_score'] < 0.15:
+        if result.alpha_result is None:
             continue
         
-        # 6. RUN SANITY CHECKS (NEW!)
-        passes, reason = passes_sanity_checks(market, signal_data, classifier, verbose=False)
+        # passes_sanity_checks records this on the market (lost if it ran in a worker)
+        market.num_prob_mentions = result.signal_data.get('num_prob_mentions', 0)
         
-        if not passes:
-            # Optionally log rejection
-            # print(f"  ❌ Rejected: {question[:50]}... - {reason}")
+        candidates += 1
+        if not result.passes:
+            rejection_reasons[result.reason] = rejection_reasons.get(result.reason, 0) + 1
             continue
         
-        opportunities.append({
-            'market_id': idx,
-            'market': market,
-            'alpha_score': alpha_result['alpha_score'],
-            'recommendation': alpha_result['recommendation'],
-            'confidence': alpha_result['confidence'],
-            'edge': alpha_result['edge'],
-            'kelly_fraction': alpha_result['kelly_fraction'],
-            'model_estimate': alpha_result['model_estimate'],
-            'market_price': alpha_result['market_price'],
-            'signal_data': signal_data,
-            'article_count': len(relevant),
-            'has_forecast': alpha_result['has_forecast']
-        })
+        alpha_result = result.alpha_result
+        opportunities.append(Opportunity(
+            market_id=result.idx,
+            market=market,
+            alpha_score=alpha_result['alpha_score'],
+            recommendation=alpha_result['recommendation'],
+            confidence=alpha_result['confidence'],
+            edge=alpha_result['edge'],
+            kelly_fraction=alpha_result['kelly_fraction'],
+            model_estimate=alpha_result['model_estimate'],
+            market_price=alpha_result['market_price'],
+            signal_data=result.signal_data,
+            article_count=result.article_count,
+            has_forecast=alpha_result['has_forecast']
+        ))
         
         if len(opportunities) % 5 == 0 and len(opportunities) > 0:
             print(f"  ✓ Found {len(opportunities)} opportunities so far...")
     
-    print(f"\n✅ Total opportunities found (before final filter): {len(opportunities)}")
+    if snapshots is not None:
+        snapshots.flush()
+        print(f"\n📸 Market snapshots: {snapshots.summary()}")
+    
+    print(f"\n✅ Total opportunities found (before final filter): {candidates}")
     
-    # 7. FINAL BATCH FILTERING (NEW!)
-    opportunities = filter_opportunities(opportunities, classifier, verbose=True)
+    # 7. FINAL FILTERING: the sanity checks already ran per market in step 6
+    print("\n🔍 Running custom-tuned sanity checks...")
+    report_filtering(candidates, len(opportunities), rejection_reasons)
     
     # Sort by alpha score
-    opportunities.sort(key=lambda x: x['alpha_score'], reverse=True)
+    opportunities.sort(key=lambda x: x.alpha_score, reverse=True)
     
     # Take top N
     top_opportunities = opportunities[:top_n]
@@ -296,7 +452,7 @@ def match_markets_to_topics(
     # Convert to old format
     result = {}
     for opp in top_opportunities:
-        market_id = opp['market_id']
+        market_id = opp.market_id
         result[market_id] = [opp]
     
     return result
@@ -306,14 +462,14 @@ def match_markets_to_topics(
 # DISPLAY (Updated with Better Stats)
 # ============================================================================
 
-def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
+def display_market_opportunities(topic_markets: Dict[int, List[Opportunity]], topic_model) -> None:
     """Enhanced display with sanity indicators"""
     print("\n" + "="*140)
     print("=== 🔥 ALPHAHUNT v3.1: VALIDATED MARKET SCANNER 🔥 ===")
     print("="*140 + "\n")
 
     flat = [(tid, m) for tid, markets in topic_markets.items() for m in markets]
-    flat.sort(key=lambda x: x[1]["alpha_score"], reverse=True)
+    flat.sort(key=lambda x: x[1].alpha_score, reverse=True)
 
     if not flat:
         print("  No validated alpha opportunities found")
@@ -323,16 +479,16 @@ def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
     print("-" * 140)
 
     for rank, (tid, match) in enumerate(flat[:30], 1):
-        mkt = match["market"]
+        mkt = match.market
         
         print(f"{rank:<4} "
-              f"{mkt['platform']:<10} "
-              f"{match['alpha_score']:.3f}   "
-              f"{match['confidence']:.1%}  "
-              f"{match['edge']:.1%}   "
-              f"{match['kelly_fraction']:.2%}   "
-              f"{match['recommendation']:<40} "
-              f"{mkt['question'][:50]}")
+              f"{mkt.platform:<10} "
+              f"{match.alpha_score:.3f}   "
+              f"{match.confidence:.1%}  "
+              f"{match.edge:.1%}   "
+              f"{match.kelly_fraction:.2%}   "
+              f"{match.recommendation:<40} "
+              f"{mkt.question[:50]}")
     
     # Summary stats
     print("\n" + "="*140)
@@ -340,9 +496,9 @@ def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
     print("="*140)
     
     # Confidence distribution
-    high_conf = sum(1 for _, m in flat if m['confidence'] > 0.60)
-    med_conf = sum(1 for _, m in flat if 0.40 <= m['confidence'] <= 0.60)
-    low_conf = sum(1 for _, m in flat if m['confidence'] < 0.40)
+    high_conf = sum(1 for _, m in flat if m.confidence > 0.60)
+    med_conf = sum(1 for _, m in flat if 0.40 <= m.confidence <= 0.60)
+    low_conf = sum(1 for _, m in flat if m.confidence < 0.40)
     
     print(f"\n📊 Confidence Distribution:")
     print(f"   High (>60%): {high_conf}")
@@ -350,9 +506,9 @@ def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
     print(f"   Low (<40%): {low_conf}")
     
     # Edge distribution
-    large_edge = sum(1 for _, m in flat if m['edge'] > 0.20)
-    med_edge = sum(1 for _, m in flat if 0.15 <= m['edge'] <= 0.20)
-    small_edge = sum(1 for _, m in flat if m['edge'] < 0.15)
+    large_edge = sum(1 for _, m in flat if m.edge > 0.20)
+    med_edge = sum(1 for _, m in flat if 0.15 <= m.edge <= 0.20)
+    small_edge = sum(1 for _, m in flat if m.edge < 0.15)
     
     print(f"\n📈 Edge Distribution:")
     print(f"   Large (>20%): {large_edge}")
@@ -360,9 +516,9 @@ def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
     print(f"   Small (<15%): {small_edge}")
     
     # Directional
-    buy_yes = sum(1 for _, m in flat if '🟢' in m['recommendation'])
-    buy_no = sum(1 for _, m in flat if '🔴' in m['recommendation'])
-    weak = sum(1 for _, m in flat if '⚠️' in m['recommendation'])
+    buy_yes = sum(1 for _, m in flat if '🟢' in m.recommendation)
+    buy_no = sum(1 for _, m in flat if '🔴' in m.recommendation)
+    weak = sum(1 for _, m in flat if '⚠️' in m.recommendation)
     
     print(f"\n📈 Directional Breakdown:")
     print(f"   🟢 BUY YES: {buy_yes}")
@@ -372,19 +528,19 @@ def display_market_opportunities(topic_markets: Dict, topic_model) -> None:
     # Signal composition for top 5
     print(f"\n🔍 Top 5 Signal Breakdown:")
     for rank, (tid, match) in enumerate(flat[:5], 1):
-        print(f"\n{rank}. {match['market']['question'][:60]}...")
-        sd = match['signal_data']
-        print(f"   Model: {match['model_estimate']:.1%} vs Market: {match['market_price']:.1%}")
+        print(f"\n{rank}. {match.market.question[:60]}...")
+        sd = match.signal_data
+        print(f"   Model: {match.model_estimate:.1%} vs Market: {match.market_price:.1%}")
         
         if sd.get('probability_estimate'):
             print(f"   → Probability extraction: {sd['probability_estimate']:.1%} ({sd['num_prob_mentions']} mentions)")
         
         print(f"   → Sentiment: {sd['sentiment_estimate']:.1%} (conf: {sd['sentiment_confidence']:.2f})")
-        print(f"   → Recalibrated confidence: {match['confidence']:.1%}")
+        print(f"   → Recalibrated confidence: {match.confidence:.1%}")
 
 
 
-def export_market_opportunities(topic_markets: Dict, topic_model, output_dir: str = None):
+def export_market_opportunities(topic_markets: Dict[int, List[Opportunity]], topic_model, output_dir: str = None):
     """Export opportunities"""
     import csv
     from datetime import datetime
@@ -415,7 +571,7 @@ def export_market_opportunities(topic_markets: Dict, topic_model, output_dir: st
     print(f"\n📊 Exporting to {filepath}...")
 
     flat = [(tid, m) for tid, markets in topic_markets.items() for m in markets]
-    flat.sort(key=lambda x: x[1]["alpha_score"], reverse=True)
+    flat.sort(key=lambda x: x[1].alpha_score, reverse=True)
 
 
     with open(filepath, 'w', newline='', encoding='utf-8') as f:
@@ -430,25 +586,25 @@ def export_market_opportunities(topic_markets: Dict, topic_model, output_dir: st
 
 
         for rank, (tid, match) in enumerate(flat, 1):
-            market = match['market']
-            sd = match['signal_data']
+            market = match.market
+            sd = match.signal_data
 
 
             writer.writerow([
                 rank,
-                market['platform'],
-                market['question'],
-                market['url'],
-                f"{match['market_price']:.3f}",
-                f"{match['model_estimate']:.3f}",
-                f"{match['edge']:.3f}",
-                f"{match['alpha_score']:.3f}",
-                f"{match['confidence']:.3f}",
-                f"{match['kelly_fraction']:.4f}",
-                match['recommendation'],
+                market.platform,
+                market.question,
+                market.url,
+                f"{match.market_price:.3f}",
+                f"{match.model_estimate:.3f}",
+                f"{match.edge:.3f}",
+                f"{match.alpha_score:.3f}",
+                f"{match.confidence:.3f}",
+                f"{match.kelly_fraction:.4f}",
+                match.recommendation,
                 sd['num_prob_mentions'],
                 sd['num_articles'],
-                f"{market.get('hours_until_close', 0):.1f}",
+                f"{market.hours_until_close:.1f}",
                 'YES'  # All exported opportunities passed validation
             ])
 
@@ -0,0 +1,118 @@
+"""
+near_dedup.py - Collapse syndicated near-duplicate articles (MinHash + LSH)
+Wire stories re-published across outlets with small edits survive URL dedup;
+they are merged into one representative carrying a 'syndication_count'.
+"""
+import re
+import zlib
+import numpy as np
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List
+
+from .config import (
+    NEAR_DUP_THRESHOLD,
+    NEAR_DUP_NUM_PERM,
+    NEAR_DUP_BANDS,
+    NEAR_DUP_SHINGLE_SIZE
+)
+
+_PRIME = np.uint64(4294967311)      # smallest prime > 2**32, keeps a*x+b inside uint64
+_MAX_HASH = np.uint64(2**32 - 1)
+
+
+def _shingle_hashes(text: str, k: int) -> np.ndarray:
+    """32-bit hashes of the distinct k-word shingles of a text"""
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    if len(words) <= k:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+
+def minhash_signatures(texts: List[str], num_perm: int = NEAR_DUP_NUM_PERM,
+                       shingle_size: int = NEAR_DUP_SHINGLE_SIZE, seed: int = 1) -> np.ndarray:
+    """(n_texts, num_perm) MinHash signatures; empty texts get all-max rows"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**32, size=num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)[:, None]
+
+    sigs = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint64)
+    for i, text in enumerate(texts):
+        h = _shingle_hashes(text, shingle_size)
+        if h.size:
+            sigs[i] = ((a * h[None, :] + b) % _PRIME).min(axis=1)
+    return sigs
+
+
+def _candidate_pairs(sigs: np.ndarray, bands: int):
+    """Pairs sharing at least one identical LSH band"""
+    n, num_perm = sigs.shape
+    rows = num_perm // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        chunk = sigs[:, band * rows:(band + 1) * rows]
+        for i in range(n):
+            buckets[chunk[i].tobytes()].append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                pairs.update(combinations(members, 2))
+    return pairs
+
+
+def collapse_near_duplicates(
+    articles: List[Dict],
+    threshold: float = NEAR_DUP_THRESHOLD,
+    bands: int = NEAR_DUP_BANDS
+) -> List[Dict]:
+    """
+    Merge articles whose estimated body Jaccard similarity >= threshold.
+    Each cluster keeps its longest article (at the cluster's first position),
+    with 'syndication_count' = number of copies collapsed into it.
+    """
+    if len(articles) < 2:
+        for a in articles:
+            a.setdefault('syndication_count', 1)
+        return articles
+
+    empty = np.full(NEAR_DUP_NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    sigs = minhash_signatures([a.get('fulltext', '') for a in articles])
+    has_text = ~(sigs == empty).all(axis=1)
+
+    parent = list(range(len(articles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in _candidate_pairs(sigs, bands):
+        if not (has_text[i] and has_text[j]):
+            continue
+        if np.mean(sigs[i] == sigs[j]) >= threshold:
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)
+
+    clusters = defaultdict(list)
+    for i in range(len(articles)):
+        clusters[find(i)].append(i)
+
+    collapsed = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        rep = max(members, key=lambda i: len(articles[i].get('fulltext', '')))
+        article = articles[rep]
+        article['syndication_count'] = sum(
+            articles[i].get('syndication_count', 1) for i in members
+        )
+        collapsed.append(article)
+    return collapsed
@@ -0,0 +1,240 @@
+"""
+nli.py - Batched zero-shot (NLI) scoring
+Same scores as calling the transformers zero-shot pipeline once per text,
+but every (premise, hypothesis) pair is run through the model in padded,
+length-sorted batches and scattered back to its request.
+"""
+import time
+import numpy as np
+import torch
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import NLI_BATCH_SIZE
+from .nli_cache import get_nli_cache
+
+HYPOTHESIS_TEMPLATE = "This example is {}."   # transformers pipeline default
+
+
+def _entailment_id(classifier) -> int:
+    for label, ind in classifier.model.config.label2id.items():
+        if label.lower().startswith("entail"):
+            return ind
+    return -1
+
+
+def _model_name(classifier) -> str:
+    return getattr(classifier.model.config, "_name_or_path", None) or type(classifier.model).__name__
+
+
+def _pair_logits(
+    classifier,
+    pairs: List[Tuple[str, str]],
+    batch_size: int,
+    forward_stats: Optional[Dict] = None
+) -> np.ndarray:
+    """
+    Raw NLI logits for each (premise, hypothesis) pair, shape (n_pairs, n_classes).
+    Rows whose batch failed are NaN.
+    """
+    t0 = time.perf_counter()
+    tokenizer, model = classifier.tokenizer, classifier.model
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    encoded = tokenizer(
+        [p for p, _ in pairs],
+        [h for _, h in pairs],
+        truncation="only_first"
+    )
+    input_ids = encoded["input_ids"]
+    extra_keys = [k for k in encoded.keys() if k != "input_ids"]
+
+    # sort by token length so each batch pads to a similar length
+    order = sorted(range(len(pairs)), key=lambda i: len(input_ids[i]))
+    out = np.full((len(pairs), model.config.num_labels), np.nan, dtype=np.float32)
+
+    with torch.inference_mode():
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            features = [
+                {"input_ids": input_ids[i], **{k: encoded[k][i] for k in extra_keys}}
+                for i in batch_idx
+            ]
+            try:
+                inputs = tokenizer.pad(features, return_tensors="pt").to(model.device)
+                logits = model(**inputs).logits
+                out[batch_idx] = logits.float().cpu().numpy()
+            except Exception as e:
+                print(f"  ⚠️ NLI batch failed ({len(batch_idx)} pairs): {e}")
+
+    if forward_stats is not None:
+        forward_stats['pairs'] = forward_stats.get('pairs', 0) + len(pairs)
+        forward_stats['seconds'] = forward_stats.get('seconds', 0.0) + time.perf_counter() - t0
+    return out
+
+
+def _cached_pair_logits(
+    classifier,
+    pairs: List[Tuple[str, str]],
+    batch_size: int,
+    forward_stats: Optional[Dict] = None
+) -> np.ndarray:
+    """_pair_logits, forwarding only pairs missing from the NLI cache"""
+    cache = get_nli_cache()
+    if cache is None:
+        return _pair_logits(classifier, pairs, batch_size, forward_stats)
+
+    model_name = _model_name(classifier)
+    keys = [cache.key(model_name, p, h) for p, h in pairs]
+    cached = cache.get_many(keys)
+
+    # forward each distinct missing pair once
+    missing = {}
+    for key, pair in zip(keys, pairs):
+        if key not in cached and key not in missing:
+            missing[key] = pair
+
+    fresh = {}
+    if missing:
+        miss_logits = _pair_logits(classifier, list(missing.values()), batch_size, forward_stats)
+        fresh = dict(zip(missing.keys(), miss_logits))
+        cache.set_many({k: v for k, v in fresh.items() if not np.isnan(v).any()})
+
+    return np.vstack([fresh[k] if k in fresh else cached[k] for k in keys])
+
+
+def _postprocess(
+    sequence: str,
+    candidate_labels: Sequence[str],
+    logits: np.ndarray,
+    entailment_id: int,
+    multi_label: bool
+) -> Dict:
+    """Mirror ZeroShotClassificationPipeline.postprocess for one sequence"""
+    if multi_label or len(candidate_labels) == 1:
+        contradiction_id = -1 if entailment_id == 0 else 0
+        entail_contr = logits[..., [contradiction_id, entailment_id]]
+        scores = np.exp(entail_contr) / np.exp(entail_contr).sum(-1, keepdims=True)
+        scores = scores[..., 1]
+    else:
+        entail = logits[..., entailment_id]
+        scores = np.exp(entail) / np.exp(entail).sum(-1, keepdims=True)
+
+    top_inds = list(reversed(scores.argsort()))
+    return {
+        "sequence": sequence,
+        "labels": [candidate_labels[i] for i in top_inds],
+        "scores": scores[top_inds].tolist(),
+    }
+
+
+def zero_shot_many(
+    classifier,
+    requests: List[Tuple[str, Sequence[str]]],
+    multi_label: bool = False,
+    batch_size: int = NLI_BATCH_SIZE,
+    forward_stats: Optional[Dict] = None
+) -> List[Optional[Dict]]:
+    """
+    Classify many (sequence, candidate_labels) requests, possibly from different
+    markets, in shared batches. Returns one pipeline-style result dict per
+    request, or None where classification failed.
+    forward_stats, if given, accumulates 'pairs' actually run through the
+    model (cache hits excluded) and the 'seconds' those forwards took.
+    """
+    if not requests:
+        return []
+
+    # inference-service clients batch (and cache) on the service side
+    if hasattr(classifier, "classify_many"):
+        return classifier.classify_many(requests, multi_label=multi_label)
+
+    # non-pipeline callables: fall back to one call per request
+    if not (hasattr(classifier, "model") and hasattr(classifier, "tokenizer")):
+        return [_classify_single(classifier, seq, labels, multi_label) for seq, labels in requests]
+
+    pairs = []
+    spans = []
+    for seq, labels in requests:
+        start = len(pairs)
+        pairs.extend((seq, HYPOTHESIS_TEMPLATE.format(label)) for label in labels)
+        spans.append((start, len(pairs)))
+
+    try:
+        logits = _cached_pair_logits(classifier, pairs, batch_size, forward_stats)
+    except Exception as e:
+        print(f"  ⚠️ Batched NLI failed, falling back to per-text calls: {e}")
+        return [_classify_single(classifier, seq, labels, multi_label) for seq, labels in requests]
+
+    entailment_id = _entailment_id(classifier)
+    results = []
+    for (seq, labels), (start, end) in zip(requests, spans):
+        req_logits = logits[start:end]
+        if np.isnan(req_logits).any():
+            results.append(_classify_single(classifier, seq, labels, multi_label))
+        else:
+            results.append(_postprocess(seq, list(labels), req_logits, entailment_id, multi_label))
+    return results
+
+
+def zero_shot_batch(
+    classifier,
+    sequences: List[str],
+    candidate_labels: Sequence[str],
+    multi_label: bool = False,
+    batch_size: int = NLI_BATCH_SIZE
+) -> List[Optional[Dict]]:
+    """Classify many sequences against the same candidate labels"""
+    return zero_shot_many(
+        classifier,
+        [(seq, candidate_labels) for seq in sequences],
+        multi_label=multi_label,
+        batch_size=batch_size
+    )
+
+
+def zero_shot_submit(
+    classifier,
+    sequences: List[str],
+    candidate_labels: Sequence[str],
+    multi_label: bool = False
+) -> Future:
+    """
+    zero_shot_batch without blocking: returns a Future of its results.
+    Inference-service clients queue the work (it joins the next micro-batch);
+    plain pipelines run it right away and return a completed Future.
+    """
+    requests = [(seq, candidate_labels) for seq in sequences]
+    if requests and hasattr(classifier, "submit_many"):
+        return classifier.submit_many(requests, multi_label=multi_label)
+    future = Future()
+    try:
+        future.set_result(zero_shot_many(classifier, requests, multi_label=multi_label))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def zero_shot_cascade_submit(
+    classifier,
+    sequences: List[str],
+    candidate_labels: Sequence[str],
+    band: float
+) -> Future:
+    """
+    zero_shot_submit through the two-tier cascade: a distilled model scores
+    everything, the full model re-scores results whose top-two margin is
+    below band. Classifiers without a fast tier score everything directly.
+    """
+    requests = [(seq, candidate_labels) for seq in sequences]
+    if requests and hasattr(classifier, "submit_cascade"):
+        return classifier.submit_cascade(requests, band)
+    return zero_shot_submit(classifier, sequences, candidate_labels)
+
+
+def _classify_single(classifier, sequence: str, candidate_labels, multi_label: bool) -> Optional[Dict]:
+    try:
+        return classifier(sequence, candidate_labels=list(candidate_labels), multi_label=multi_label)
+    except Exception:
+        return None
@@ -0,0 +1,93 @@
+"""
+nli_cache.py - Cross-market cache of zero-shot NLI results
+Key = (model, sha1(premise), hypothesis), value = raw logits for that pair.
+Caching the per-pair logits (not the final scores) keeps results exact for
+any candidate-label set the pair later appears in.
+"""
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Iterable
+
+from .disk_cache import DiskCache
+from .config import (
+    NLI_CACHE_ENABLED,
+    NLI_CACHE_MEMORY_ENTRIES,
+    NLI_CACHE_PATH,
+    NLI_CACHE_MAX_ENTRIES
+)
+
+
+class NLICache:
+    """In-memory LRU tier in front of a persistent SQLite tier"""
+
+    def __init__(self, memory_entries: int, path: str = None, max_entries: int = 500000):
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskCache(path, table="nli_logits", max_entries=max_entries) if path else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model_name: str, premise: str, hypothesis: str) -> str:
+        premise_hash = hashlib.sha1(premise.encode("utf-8")).hexdigest()
+        return f"{model_name}|{premise_hash}|{hypothesis}"
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            for k in keys:
+                if k in self._memory:
+                    self._memory.move_to_end(k)
+                    found[k] = self._memory[k]
+
+        remaining = [k for k in keys if k not in found]
+        if remaining and self._disk is not None:
+            try:
+                blobs = self._disk.get_many(remaining)
+            except Exception as e:
+                print(f"  ⚠️ NLI cache unavailable: {e}")
+                blobs = {}
+            from_disk = {k: np.frombuffer(v, dtype=np.float32) for k, v in blobs.items()}
+            self._remember(from_disk)
+            found.update(from_disk)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        items = {k: np.asarray(v, dtype=np.float32) for k, v in items.items()}
+        self._remember(items)
+        if self._disk is not None:
+            try:
+                self._disk.set_many({k: v.tobytes() for k, v in items.items()})
+            except Exception as e:
+                print(f"  ⚠️ Failed to write NLI cache: {e}")
+
+    def _remember(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for k, v in items.items():
+                self._memory[k] = v
+                self._memory.move_to_end(k)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+
+_cache = None                       # lazy init
+
+
+def get_nli_cache():
+    """Process-wide cache, or None when disabled in config"""
+    global _cache
+    if not NLI_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = NLICache(NLI_CACHE_MEMORY_ENTRIES, NLI_CACHE_PATH, NLI_CACHE_MAX_ENTRIES)
+    return _cache
@@ -0,0 +1,131 @@
+"""
+onnx_backend.py - Int8 ONNX Runtime models for CPU-only hosts
+Selected by INFERENCE_BACKEND = 'onnx' in config. Each model is exported to
+ONNX once, dynamically quantized to int8 and kept under ONNX_MODEL_DIR;
+later runs load the quantized graph directly.
+
+  - NLI classifier: optimum ORTModelForSequenceClassification wrapped in the
+    usual transformers zero-shot pipeline, so nli.py keeps using
+    classifier.model / classifier.tokenizer unchanged
+  - sentence encoder: SentenceTransformer with backend="onnx"
+
+Needs onnxruntime and optimum-onnx; falls back to the torch backend when it is missing.
+"""
+import os
+import platform
+import re
+from functools import lru_cache
+
+from .config import ONNX_MODEL_DIR, ONNX_QUANTIZATION
+
+_QUANTIZED_SUFFIX = "quantized"             # ORTQuantizer writes model_quantized.onnx
+
+
+@lru_cache(maxsize=None)
+def onnx_available() -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+        import optimum.onnxruntime  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _cpu_flags() -> frozenset:
+    """x86 feature flags from /proc/cpuinfo (empty where that is unavailable)"""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return frozenset(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return frozenset()
+
+
+@lru_cache(maxsize=None)
+def quantization_target() -> str:
+    """
+    ONNX_QUANTIZATION, or the dynamic-int8 preset matching this CPU when 'auto'.
+    Non-VNNI x86 needs the avx2/avx512 presets (reduce_range) to avoid u8s8
+    saturation, so when the flags cannot be read it assumes plain AVX2.
+    """
+    if ONNX_QUANTIZATION != 'auto':
+        return ONNX_QUANTIZATION
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return 'arm64'
+    flags = _cpu_flags()
+    if 'avx512_vnni' in flags:
+        return 'avx512_vnni'
+    if 'avx512f' in flags:
+        return 'avx512'
+    return 'avx2'
+
+
+def _quantization_config(target: str):
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    presets = {
+        'arm64': AutoQuantizationConfig.arm64,
+        'avx2': AutoQuantizationConfig.avx2,
+        'avx512': AutoQuantizationConfig.avx512,
+        'avx512_vnni': AutoQuantizationConfig.avx512_vnni,
+    }
+    if target not in presets:
+        raise ValueError(f"Unknown ONNX quantization target '{target}' (choose from {list(presets)})")
+    return presets[target](is_static=False, per_channel=False)
+
+
+def _model_dir(model_name: str, target: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "--", model_name)
+    return os.path.join(ONNX_MODEL_DIR, f"{slug}-int8-{target}")
+
+
+# ============================================================================
+# ZERO-SHOT CLASSIFIER
+# ============================================================================
+
+def load_zero_shot_classifier(model_name: str):
+    """transformers zero-shot pipeline over the int8 ONNX graph of model_name"""
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from transformers import AutoTokenizer, pipeline
+
+    target = quantization_target()
+    model_dir = _model_dir(model_name, target)
+    file_name = f"model_{_QUANTIZED_SUFFIX}.onnx"
+
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        print(f"  🔧 Exporting {model_name} to ONNX + int8 ({target}), one-time...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=model_dir,
+            quantization_config=_quantization_config(target),
+            file_suffix=_QUANTIZED_SUFFIX
+        )
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=file_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+
+
+# ============================================================================
+# SENTENCE ENCODER
+# ============================================================================
+
+def load_sentence_encoder(model_name: str):
+    """SentenceTransformer running the int8 ONNX graph of model_name on CPU"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    target = quantization_target()
+    model_dir = _model_dir(model_name, target)
+    file_name = f"onnx/model_qint8_{target}.onnx"
+
+    if not os.path.exists(os.path.join(model_dir, file_name)):
+        print(f"  🔧 Exporting {model_name} to ONNX + int8 ({target}), one-time...")
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx")
+        model.save_pretrained(model_dir)
+        export_dynamic_quantized_onnx_model(model, target, model_dir)
+
+    return SentenceTransformer(model_dir, device="cpu", backend="onnx", model_kwargs={"file_name": file_name})
@@ -10,8 +10,11 @@ from typing import List, Dict
 
 # Local imports
 from .fetch import fetch_all_prediction_markets
-from .text_processing import collect_articles_from_newsapi
+from .text_processing import collect_articles_for_queries
+from .near_dedup import collapse_near_duplicates
 from .matcher import match_markets_to_topics, display_market_opportunities, export_market_opportunities
+from .nli_cache import get_nli_cache
+from .inference import get_inference_service
 from .config import NEWSAPI_KEY, FROM_DATE, TO_DATE, PREDICTION_TOPIC_GROUPS, MAX_ARTICLES, MAX_WORKERS_ARTICLES
 
 def main(
@@ -50,29 +53,26 @@ def main(
 
     # Step 2: Collect news
     print("📰 Step 2: Collecting news articles...")
-    all_articles = []
     broad_queries = ["breaking news", "latest developments", "trending topics", "current events", "news today"] + PREDICTION_TOPIC_GROUPS[:5]
-    for query in broad_queries:
-        try:
-            articles = collect_articles_from_newsapi(
-                api_key=NEWSAPI_KEY,
-                query=query,
-                from_date=FROM_DATE,
-                to_date=TO_DATE,
-                max_articles=MAX_ARTICLES // len(broad_queries),
-                max_workers=MAX_WORKERS_ARTICLES
-            )
-            all_articles.extend(articles)
-            time.sleep(1)
-        except Exception as e:
-            print(f"⚠️ Query failed for '{query}': {e}")
-            continue
+    all_articles = collect_articles_for_queries(
+        api_key=NEWSAPI_KEY,
+        queries=broad_queries,
+        from_date=FROM_DATE,
+        to_date=TO_DATE,
+        max_articles=MAX_ARTICLES // len(broad_queries),
+        max_workers=MAX_WORKERS_ARTICLES
+    )
 
     print(f"\n✅ Collected {len(all_articles)} articles\n")
 
     if len(all_articles) < 50:
         raise RuntimeError(f"Not enough articles collected ({len(all_articles)})")
 
+    # Collapse syndicated wire copies before embedding / signal extraction
+    collected = len(all_articles)
+    all_articles = collapse_near_duplicates(all_articles)
+    print(f"🧬 Near-duplicate collapse: {collected} → {len(all_articles)} articles\n")
+
     # Step 3: Match and analyze
     print("🔍 Step 3: Analyzing markets with domain-agnostic signals...")
     topic_markets = match_markets_to_topics(
@@ -94,13 +94,17 @@ def main(
     total_opportunities = sum(len(m) for m in topic_markets.values())
     strong_signals = sum(
         1 for markets in topic_markets.values() 
-        for m in markets if m.get('confidence', 0) > 0.5
+        for m in markets if m.confidence > 0.5
     )
 
     print(f"\n{'='*80}")
     print(f"📊 FINAL SUMMARY")
     print(f"Time elapsed: {elapsed:.1f}s | Articles: {len(all_articles)} | Markets scanned: {len(markets)}")
     print(f"Opportunities: {total_opportunities} | Strong signals (>50% conf): {strong_signals}")
+    nli_cache = get_nli_cache()
+    if nli_cache is not None:
+        print(f"NLI cache: {nli_cache.hits} hits | {nli_cache.misses} misses")
+    print(f"Inference: {get_inference_service().summary()}")
     print(f"{'='*80}\n")
     print("⚠️ Educational purposes only. Trade at your own risk!")
 
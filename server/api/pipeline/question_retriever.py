@@ -2,50 +2,91 @@
 question_retriever.py  –  replaces BERTopic with question-centric retrieval
 """
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict
-import torch
+from typing import List, Dict, Tuple
 
-_device = "cuda:0" if torch.cuda.is_available() else "cpu"
-_encoder = None                     # lazy load
+from .embedding_cache import encode_cached
+from .inference import get_inference_service
+from .records import Article
 
 
-def _get_encoder():
-    global _encoder
-    if _encoder is None:
-        _encoder = SentenceTransformer("all-MiniLM-L6-v2", device=_device)
-    return _encoder
+def _article_text(article: Article) -> str:
+    """title + first 400 chars of body"""
+    return (article.get("title", "") + " " + article.get("fulltext", "")[:400]).strip()
 
 
-def retrieve_topk_for_question(articles: List[Dict],
-                               question: str,
-                               k: int = 30) -> List[Dict]:
+def _encode(texts: List[str]) -> np.ndarray:
+    """Batched, L2-normalized float32 embeddings (cache misses only)"""
+    service = get_inference_service()
+    return encode_cached(
+        service.encode,
+        service.encoder_id,
+        texts
+    )
+
+
+class ArticleCorpus:
     """
-    Return the k articles most semantically similar to the market question.
-    Adds a key 'q_score' (cosine similarity) to each returned article.
+    Article embeddings computed once per run.
+    Every market question is scored against the same (n_articles, dim) matrix.
     """
-    enc = _get_encoder()
 
-    # embed question once
-    q_emb = enc.encode(question, normalize_embeddings=True, convert_to_numpy=True)
+    def __init__(self, articles: List[Article]):
+        self.articles = articles
+        texts = [_article_text(a) for a in articles]
+        self.embeddings = _encode(texts) if texts else np.zeros((0, 0), dtype=np.float32)
 
-    # build article texts  (title + first 400 tokens of body)
-    texts = [
-        (a.get("title", "") + " " + a.get("fulltext", "")[:400]).strip()
-        for a in articles
-    ]
-    if not texts:
-        return []
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def search(self, questions: List[str], k: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score all questions against the corpus in one matrix multiply.
+        Returns (indices, scores), both (n_questions, min(k, n_articles)),
+        each row sorted by descending cosine similarity.
+        """
+        n = len(self.articles)
+        k = min(k, n)
+        if not questions or k == 0:
+            empty = np.zeros((len(questions), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        q_emb = _encode(questions)
+        scores = q_emb @ self.embeddings.T          # (n_questions, n_articles)
 
-    # embed articles
-    a_emb = enc.encode(texts, normalize_embeddings=True, convert_to_numpy=True)
+        if k < n:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.tile(np.arange(n), (len(questions), 1))
+        part_scores = np.take_along_axis(scores, part, axis=1)
 
-    # cosine similarity
-    scores = a_emb @ q_emb
-    top_idx = np.argsort(scores)[::-1][:k]
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        top_idx = np.take_along_axis(part, order, axis=1)
+        top_scores = np.take_along_axis(part_scores, order, axis=1)
+        return top_idx, top_scores
 
-    out = []
-    for i in top_idx:
-        articles[i]["q_score"] = float(scores[i])
-        out.append(articles[i])
-    return out
\ No newline at end of file
+    def take(self, indices: np.ndarray, scores: np.ndarray) -> List[Article]:
+        """
+        Materialize one row of search() results.
+        Sets 'q_score' (cosine similarity) on each returned article.
+        """
+        out = []
+        for i, s in zip(indices, scores):
+            article = self.articles[int(i)]
+            article.q_score = float(s)
+            out.append(article)
+        return out
+
+
+def retrieve_topk_for_question(articles: List[Article],
+                               question: str,
+                               k: int = 30) -> List[Article]:
+    """
+    Return the k articles most semantically similar to the market question.
+    Adds a key 'q_score' (cosine similarity) to each returned article.
+    Builds a throwaway corpus; prefer ArticleCorpus when scoring many questions.
+    """
+    if not articles:
+        return []
+    corpus = ArticleCorpus(articles)
+    top_idx, top_scores = corpus.search([question], k=k)
+    return corpus.take(top_idx[0], top_scores[0])
@@ -0,0 +1,124 @@
+"""
+records.py - Compact record types for markets, articles and opportunities
+Slotted dataclasses replace the loose string-keyed dicts that used to flow
+through the pipeline. Every field that a later stage fills in is declared up
+front, so records never grow per-instance dicts.
+
+Records also answer dict-style access (record['field'], .get, .setdefault,
+'field' in record) for the modules that still index them by key.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class _RecordMixin:
+    """Dict-style access restricted to the declared fields"""
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__slots__:
+            raise KeyError(f"{type(self).__name__} has no field '{key}'")
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        value = self.get(key)
+        if value is None:
+            self[key] = default
+            return default
+        return value
+
+
+# ============================================================================
+# RECORDS
+# ============================================================================
+
+@dataclass(slots=True, eq=False)
+class Market(_RecordMixin):
+    platform: str
+    market_id: str
+    question: str
+    description: str
+    yes_price: float
+    no_price: float
+    volume: float
+    liquidity: float
+    end_date: str
+    hours_until_close: float
+    url: Optional[str]
+    raw_yes_price: Optional[float] = None       # before Manifold bias calibration
+
+    # filled in by later stages
+    num_prob_mentions: int = 0                  # validation
+    external_forecast: Optional[Dict] = None    # external_forecasts
+    comment_analysis: Optional[Dict] = None     # manifold_comments
+
+
+@dataclass(slots=True, eq=False)
+class Article(_RecordMixin):
+    title: str
+    link: Optional[str]
+    snippet: str
+    date: str
+    fulltext: str
+
+    # filled in by later stages
+    syndication_count: int = 1                  # near_dedup
+    q_score: float = 0.0                        # question_retriever (last question scored)
+    head_words: Optional[frozenset] = None      # universal_signals (sentiment relevance)
+
+
+@dataclass(slots=True, eq=False)
+class Opportunity(_RecordMixin):
+    market_id: int
+    market: Market
+    alpha_score: float
+    recommendation: str
+    confidence: float
+    edge: float
+    kelly_fraction: float
+    model_estimate: float
+    market_price: float
+    signal_data: Dict
+    article_count: int
+    has_forecast: bool
+
+
+# ============================================================================
+# COLUMNAR BATCH
+# ============================================================================
+
+class MarketBatch:
+    """
+    Struct-of-arrays view over a list of markets: the numeric fields as
+    NumPy columns, for filtering/scoring many markets in one pass.
+    """
+    __slots__ = ('markets', 'yes_price', 'liquidity', 'volume', 'hours_until_close', 'question_len')
+
+    def __init__(self, markets: Iterable[Market]):
+        self.markets = list(markets)
+        n = len(self.markets)
+        self.yes_price = np.fromiter((m.yes_price for m in self.markets), dtype=np.float64, count=n)
+        self.liquidity = np.fromiter((m.liquidity for m in self.markets), dtype=np.float64, count=n)
+        self.volume = np.fromiter((m.volume for m in self.markets), dtype=np.float64, count=n)
+        self.hours_until_close = np.fromiter((m.hours_until_close for m in self.markets), dtype=np.float64, count=n)
+        self.question_len = np.fromiter((len(m.question) for m in self.markets), dtype=np.int64, count=n)
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def select(self, mask: np.ndarray) -> List[Market]:
+        """Markets where mask is True, in original order"""
+        return [self.markets[i] for i in np.flatnonzero(mask)]
@@ -1,110 +1,123 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-
-import re
+from typing import Dict, List
 
 from newsapi import NewsApiClient
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from .config import HEADERS
+from .config import HEADERS, NEWSAPI_QUERIES_PER_SEC, NEWSAPI_QUERY_BURST
+from .html_extract import extract_article_text
+from .async_fetch import AsyncArticleFetcher, TokenBucket
+from .url_dedup import UrlDedupIndex
+from .article_cache import get_article_cache
+from .records import Article
 
 
+_session = requests.Session()
+_session.headers.update(HEADERS)
 
 
 def fetch_article_body(url):
-    """Fetch full article content"""
+    """Fetch full article content (through the persistent article cache)"""
+    cache = get_article_cache()
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.stats['fresh_hits'] += 1
+        return entry.fulltext
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        headers = entry.conditional_headers() if entry is not None else None
+        resp = _session.get(url, timeout=10, headers=headers)
+        if resp.status_code == 304 and entry is not None:
+            cache.mark_revalidated(url, entry)
+            return entry.fulltext
         if resp.status_code != 200:
             return None
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        for element in soup.find_all(['script', 'style', 'nav', 'header', 'footer', 
-                                       'aside', 'form', 'button', 'iframe']):
-            element.decompose()
-        
-        for element in soup.find_all(class_=re.compile(r'(nav|menu|sidebar|footer|header|cookie|newsletter|subscribe|comment|social|share)', re.I)):
-            element.decompose()
-        
-        for element in soup.find_all(id=re.compile(r'(nav|menu|sidebar|footer|header|cookie|newsletter|subscribe|comment|social|share)', re.I)):
-            element.decompose()
-        
-        article_content = None
-        article_selectors = [
-            'article', '[class*="article"]', '[class*="content"]',
-            '[class*="post"]', '[id*="article"]', '[id*="content"]', 'main'
-        ]
-        
-        for selector in article_selectors:
-            article_content = soup.select_one(selector)
-            if article_content:
-                paragraphs = article_content.find_all("p")
-                break
-        
-        if not article_content:
-            paragraphs = soup.find_all("p")
-        
-        text_parts = []
-        for p in paragraphs:
-            p_text = p.get_text(strip=True)
-            if len(p_text) > 40:
-                text_parts.append(p_text)
-        
-        text = " ".join(text_parts)
-        if len(text) > 50000:
-            text = text[:50000]
-        if len(text) > 100000:
-            return None
-            
-        return text if len(text) > 300 else None
-        
+        text = extract_article_text(resp.text)
+        # failed extractions are not cached, so the next run retries them
+        if cache is not None and text:
+            cache.store(url, text, resp.headers.get('ETag'), resp.headers.get('Last-Modified'), resp.url)
+        return text
     except:
         return None
 
+
+def _build_articles(articles_data: List[Dict], texts: List) -> List[Article]:
+    """Pair NewsAPI metadata with downloaded bodies, dropping short/failed ones"""
+    enhanced_articles = []
+    for completed, (article, full_text) in enumerate(zip(articles_data, texts), 1):
+        if full_text and len(full_text) > 300:
+            enhanced_articles.append(Article(
+                title=article.get('title', 'No title'),
+                link=article.get('url'),
+                snippet=article.get('description', ''),
+                date=article.get('publishedAt', ''),
+                fulltext=full_text
+            ))
+            print(f"  [{completed}/{len(articles_data)}] ✅")
+        else:
+            print(f"  [{completed}/{len(articles_data)}] ⚠️ Skipped")
+    return enhanced_articles
+
+
+async def _collect_all(api_key, queries, from_date, to_date, max_articles, max_workers, dedup):
+    newsapi = NewsApiClient(api_key=api_key)
+    rate_limit = TokenBucket(NEWSAPI_QUERIES_PER_SEC, NEWSAPI_QUERY_BURST)
+
+    async with AsyncArticleFetcher(max_concurrency=max_workers) as fetcher:
+
+        async def run_query(query):
+            await rate_limit.acquire()
+            print(f"🔍 Fetching articles from NewsAPI for: {query}")
+            try:
+                response = await asyncio.to_thread(
+                    newsapi.get_everything,
+                    q=query, from_param=from_date, to=to_date,
+                    language='en', sort_by='relevancy',
+                    page_size=min(max_articles, 100)
+                )
+                found = response.get('articles', [])
+                # URLs already claimed by another query are never downloaded again
+                articles_data = [a for a in found if dedup.claim(a.get('url'))]
+                print(f"  📰 Found {len(found)} articles ({len(articles_data)} new) for: {query}")
+
+                # bodies go straight into the shared pool while other searches run
+                pages = await asyncio.gather(
+                    *(fetcher.fetch_page(article.get('url')) for article in articles_data)
+                )
+                texts = [
+                    text if dedup.claim_final(article.get('url'), final_url) else None
+                    for article, (text, final_url) in zip(articles_data, pages)
+                ]
+                enhanced_articles = _build_articles(articles_data, texts)
+                print(f"  ✅ Fetched {len(enhanced_articles)} articles for: {query}")
+                return enhanced_articles
+            except Exception as e:
+                print(f"  ❌ Error for '{query}': {e}")
+                return []
+
+        # results keep query order regardless of completion order
+        return await asyncio.gather(*(run_query(q) for q in queries))
+
+
+def collect_articles_for_queries(api_key, queries, from_date, to_date, max_articles=100, max_workers=15):
+    """
+    Run all NewsAPI searches concurrently (token-bucket rate limited) and
+    stream every result URL into one shared body-fetch pool.
+    Each canonical URL is downloaded at most once across all queries.
+    Returns the articles of all queries, in query order.
+    """
+    dedup = UrlDedupIndex()
+    per_query = asyncio.run(
+        _collect_all(api_key, list(queries), from_date, to_date, max_articles, max_workers, dedup)
+    )
+    print(f"  🔗 URL dedup: {dedup.summary()}")
+    cache = get_article_cache()
+    if cache is not None:
+        print(f"  💾 Article cache: {cache.summary()}")
+    return [article for articles in per_query for article in articles]
+
+
 def collect_articles_from_newsapi(api_key, query, from_date, to_date, max_articles=100, max_workers=15):
     """Collect articles from NewsAPI"""
-    newsapi = NewsApiClient(api_key=api_key)
-    print(f"🔍 Fetching articles from NewsAPI for: {query}")
-    
-    try:
-        response = newsapi.get_everything(
-            q=query, from_param=from_date, to=to_date,
-            language='en', sort_by='relevancy',
-            page_size=min(max_articles, 100)
-        )
-        
-        articles_data = response.get('articles', [])
-        print(f"  📰 Found {len(articles_data)} articles")
-        
-        enhanced_articles = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_article = {
-                executor.submit(fetch_article_body, article.get('url')): article
-                for article in articles_data
-            }
-            
-            completed = 0
-            for future in as_completed(future_to_article):
-                completed += 1
-                article = future_to_article[future]
-                
-                try:
-                    full_text = future.result()
-                    if full_text and len(full_text) > 300:
-                        enhanced_articles.append({
-                            'title': article.get('title', 'No title'),
-                            'link': article.get('url'),
-                            'snippet': article.get('description', ''),
-                            'date': article.get('publishedAt', ''),
-                            'fulltext': full_text
-                        })
-                        print(f"  [{completed}/{len(articles_data)}] ✅")
-                    else:
-                        print(f"  [{completed}/{len(articles_data)}] ⚠️ Skipped")
-                except:
-                    print(f"  [{completed}/{len(articles_data)}] ❌")
-        
-        print(f"  ✅ Fetched {len(enhanced_articles)} articles")
-        return enhanced_articles
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
-        return []
+    return collect_articles_for_queries(
+        api_key, [query], from_date, to_date,
+        max_articles=max_articles, max_workers=max_workers
+    )
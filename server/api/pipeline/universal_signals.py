@@ -4,10 +4,15 @@ FIXED VERSION: More conservative, fewer false positives
 """
 import re
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Callable, List, Dict, NamedTuple, Tuple, Optional
 from datetime import datetime, timezone
 from collections import Counter
 
+from .config import NLI_CASCADE_ENABLED, NLI_CASCADE_BAND
+from .nli import zero_shot_submit, zero_shot_cascade_submit
+
 
 # ============================================================================
 # ENTITY EXTRACTION
@@ -35,137 +40,283 @@ def is_comparative_question(question: str) -> bool:
 # IMPROVED PROBABILITY EXTRACTION
 # ============================================================================
 
-def extract_all_probabilities(text: str, question: str = "", context_window: int = 200) -> List[Tuple[float, str, float]]:
+# Compiled once; each family is scanned in this order so results keep the
+# same ordering as the original per-pattern loops.
+_PERCENT_PATTERNS = [
+    (re.compile(r'(\d+(?:\.\d+)?)\s*%', re.IGNORECASE), 1.0),
+    (re.compile(r'(\d+(?:\.\d+)?)\s*percent', re.IGNORECASE), 1.0),
+]
+
+_FRACTION_PATTERNS = [
+    re.compile(r'(\d+)\s*in\s*(\d+)'),
+    re.compile(r'(\d+)\s*out\s*of\s*(\d+)'),
+    re.compile(r'(\d+)\s*to\s*(\d+)'),
+]
+
+_QUALITATIVE_PATTERNS = [
+    (re.compile(r'\b(certain|definitely|surely)\b', re.IGNORECASE), 0.95, 0.35),
+    (re.compile(r'\b(very likely|highly likely|probable)\b', re.IGNORECASE), 0.75, 0.45),
+    (re.compile(r'\b(likely|expected|probably)\b', re.IGNORECASE), 0.65, 0.40),
+    (re.compile(r'\b(possible|maybe|perhaps|could)\b', re.IGNORECASE), 0.50, 0.25),
+    (re.compile(r'\b(unlikely|doubtful)\b', re.IGNORECASE), 0.35, 0.40),
+    (re.compile(r'\b(very unlikely|highly unlikely)\b', re.IGNORECASE), 0.25, 0.45),
+    (re.compile(r'\b(impossible|definitely not)\b', re.IGNORECASE), 0.05, 0.35),
+]
+
+_PROB_KEYWORDS = ('chance', 'probability', 'odds', 'forecast', 'estimate', 'poll', 'predict')
+_FINANCIAL_TERMS = ('revenue', 'profit', 'sales', 'growth rate', 'increase by')
+_YEAR_RE = re.compile(r'20\d{2}')
+
+_PERCENT, _FRACTION, _QUALITATIVE = 0, 1, 2
+
+
+class Mention(NamedTuple):
+    """One question-independent probability mention in an article"""
+    kind: int                   # _PERCENT / _FRACTION / _QUALITATIVE
+    pattern: int                # index within its pattern family
+    probs: Tuple[float, ...]    # fraction matches can yield two readings
+    start: int                  # context window [start, end) in the text
+    end: int
+    conf: float                 # base confidence
+    has_keyword: bool           # percent only: probability keyword in context
+    has_year: bool              # percent only: 20xx in context
+    has_financial: bool         # percent only: financial term in context
+
+
+class ArticleScan:
     """
-    Extract probabilities with STRICT validation
-    Only returns probabilities actually relevant to the question
+    Every probability pattern matched over one text, with context offsets.
+    The text is lowercased once; context windows are slices of it.
+
+    Entity checks go through an inverted index of the lowercase text:
+    term -> sorted start offsets, built lazily the first time a term is
+    queried and reused by every later market asking about the same term.
     """
-    results = []
-    
-    # Extract entities for validation
-    question_entities = extract_key_entities(question) if question else []
-    is_comparative = is_comparative_question(question)
-    
-    # Pattern 1: Explicit percentages
-    percent_patterns = [
-        (r'(\d+(?:\.\d+)?)\s*%', 1.0),
-        (r'(\d+(?:\.\d+)?)\s*percent', 1.0),
-    ]
-    
-    for pattern, confidence in percent_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            try:
+    __slots__ = ('text', 'lower', 'mentions', 'postings')
+
+    def __init__(self, text: str, context_window: int = 200):
+        self.text = text
+        lower = text.lower()
+        # a few characters change length when lowercased, which breaks offsets
+        self.lower = lower if len(lower) == len(text) else None
+        self.mentions = self._scan(context_window)
+        self.postings = {}
+
+    def term_offsets(self, term: str) -> List[int]:
+        """Start offsets of every (possibly overlapping) occurrence of a lowercase term"""
+        offsets = self.postings.get(term)
+        if offsets is None:
+            offsets = []
+            i = self.lower.find(term)
+            while i != -1:
+                offsets.append(i)
+                i = self.lower.find(term, i + 1)
+            self.postings[term] = offsets
+        return offsets
+
+    def count_terms_in_window(self, terms: List[str], start: int, end: int) -> int:
+        """
+        How many lowercase terms occur entirely inside text[start:end]
+        (same answer as `term in context_lower` for each term)
+        """
+        if self.lower is None:
+            context_lower = self.text[start:end].lower()
+            return sum(1 for term in terms if term in context_lower)
+
+        count = 0
+        for term in terms:
+            if not term:
+                count += 1
+                continue
+            offsets = self.term_offsets(term)
+            # earliest occurrence starting inside the window ends first
+            i = bisect_left(offsets, start)
+            if i < len(offsets) and offsets[i] + len(term) <= end:
+                count += 1
+        return count
+
+    def context(self, m: Mention) -> str:
+        return self.text[m.start:m.end]
+
+    def context_lower(self, m: Mention) -> str:
+        if self.lower is not None:
+            return self.lower[m.start:m.end]
+        return self.text[m.start:m.end].lower()
+
+    def _window(self, match, context_window: int) -> Tuple[int, int]:
+        return max(0, match.start() - context_window), min(len(self.text), match.end() + context_window)
+
+    def _scan(self, context_window: int) -> List[Mention]:
+        text = self.text
+        mentions = []
+
+        # Pattern 1: Explicit percentages
+        for p_idx, (pattern, confidence) in enumerate(_PERCENT_PATTERNS):
+            for match in pattern.finditer(text):
                 prob = float(match.group(1)) / 100
                 if not (0.01 <= prob <= 0.99):
                     continue
-                
-                start = max(0, match.start() - context_window)
-                end = min(len(text), match.end() + context_window)
-                context = text[start:end]
-                context_lower = context.lower()
-                
-                # STRICT VALIDATION
-                if question_entities:
-                    entity_matches = sum(1 for ent in question_entities if ent.lower() in context_lower)
-                    
-                    # Comparative questions need BOTH entities
-                    required_matches = len(question_entities) if is_comparative else max(1, len(question_entities) // 2)
-                    
-                    if entity_matches < required_matches:
-                        continue
-                    
-                    # Boost confidence for multiple entity matches
-                    if entity_matches >= len(question_entities):
-                        confidence *= 1.5
-                    elif entity_matches >= required_matches:
-                        confidence *= 1.2
-                
-                # Boost for probability keywords
-                if any(kw in context_lower for kw in ['chance', 'probability', 'odds', 'forecast', 'estimate', 'poll', 'predict']):
-                    confidence *= 1.3
-                
-                # Penalize if near year dates (often GDP %, not probabilities)
-                if re.search(r'20\d{2}', context):
-                    confidence *= 0.6
-                
-                # Penalize if near financial terms (price changes, not probabilities)
-                if any(term in context_lower for term in ['revenue', 'profit', 'sales', 'growth rate', 'increase by']):
-                    confidence *= 0.5
-                
-                results.append((prob, context, min(1.0, confidence)))
-            except:
-                continue
-    
-    # Pattern 2: Fractions
-    fraction_patterns = [
-        r'(\d+)\s*in\s*(\d+)',
-        r'(\d+)\s*out\s*of\s*(\d+)',
-        r'(\d+)\s*to\s*(\d+)',
-    ]
-    
-    for pattern in fraction_patterns:
-        for match in re.finditer(pattern, text):
-            try:
+                start, end = self._window(match, context_window)
+                mention = Mention(_PERCENT, p_idx, (prob,), start, end, confidence, False, False, False)
+                context_lower = self.context_lower(mention)
+                mentions.append(mention._replace(
+                    has_keyword=any(kw in context_lower for kw in _PROB_KEYWORDS),
+                    has_year=_YEAR_RE.search(text, start, end) is not None,
+                    has_financial=any(term in context_lower for term in _FINANCIAL_TERMS)
+                ))
+
+        # Pattern 2: Fractions
+        for p_idx, pattern in enumerate(_FRACTION_PATTERNS):
+            for match in pattern.finditer(text):
                 num1 = float(match.group(1))
                 num2 = float(match.group(2))
-                
+                if num1 + num2 == 0:
+                    continue
+
                 prob1 = num1 / (num1 + num2)
                 prob2 = num1 / num2 if num2 != 0 else None
-                
-                for prob in [prob1, prob2]:
-                    if prob and 0.01 <= prob <= 0.99:
-                        start = max(0, match.start() - context_window)
-                        end = min(len(text), match.end() + context_window)
-                        context = text[start:end]
-                        context_lower = context.lower()
-                        
-                        conf = 0.6
-                        
-                        if question_entities:
-                            entity_matches = sum(1 for ent in question_entities if ent.lower() in context_lower)
-                            required_matches = len(question_entities) if is_comparative else 1
-                            
-                            if entity_matches < required_matches:
-                                continue
-                            if entity_matches >= required_matches:
-                                conf *= 1.2
-                        
-                        results.append((prob, context, conf))
-            except:
-                continue
-    
-    # Pattern 3: Qualitative (LOWER weights)
-    qualitative_map = {
-        r'\b(certain|definitely|surely)\b': (0.95, 0.35),
-        r'\b(very likely|highly likely|probable)\b': (0.75, 0.45),
-        r'\b(likely|expected|probably)\b': (0.65, 0.40),
-        r'\b(possible|maybe|perhaps|could)\b': (0.50, 0.25),
-        r'\b(unlikely|doubtful)\b': (0.35, 0.40),
-        r'\b(very unlikely|highly unlikely)\b': (0.25, 0.45),
-        r'\b(impossible|definitely not)\b': (0.05, 0.35),
-    }
-    
-    for pattern, (prob, conf) in qualitative_map.items():
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            start = max(0, match.start() - context_window)
-            end = min(len(text), match.end() + context_window)
-            context = text[start:end]
-            context_lower = context.lower()
-            
-            if question_entities:
-                entity_matches = sum(1 for ent in question_entities if ent.lower() in context_lower)
-                if entity_matches < 1:
+
+                probs = tuple(prob for prob in (prob1, prob2) if prob and 0.01 <= prob <= 0.99)
+                if not probs:
                     continue
-            
-            results.append((prob, context, conf))
-    
+                start, end = self._window(match, context_window)
+                mentions.append(Mention(_FRACTION, p_idx, probs, start, end, 0.6, False, False, False))
+
+        # Pattern 3: Qualitative (LOWER weights)
+        for p_idx, (pattern, prob, conf) in enumerate(_QUALITATIVE_PATTERNS):
+            for match in pattern.finditer(text):
+                start, end = self._window(match, context_window)
+                mentions.append(Mention(_QUALITATIVE, p_idx, (prob,), start, end, conf, False, False, False))
+
+        return mentions
+
+
+class MentionIndex:
+    """
+    ArticleScan of every article in a run, keyed by article identity.
+    Mentions do not depend on the question, so the index is built once and
+    each market's extraction is just a filter over it.
+    """
+
+    def __init__(self, articles: List[Dict], max_chars: int = 5000, context_window: int = 200):
+        self.max_chars = max_chars
+        self.context_window = context_window
+        self._scans = {}
+        for article in articles:
+            self.scan(article)
+
+    def scan(self, article: Dict) -> ArticleScan:
+        entry = self._scans.get(id(article))
+        if entry is None:
+            text = article.get('fulltext', '')[:self.max_chars]
+            # keep the article referenced so its id() cannot be reused
+            entry = (article, ArticleScan(text, self.context_window))
+            self._scans[id(article)] = entry
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._scans)
+
+    def num_mentions(self) -> int:
+        return sum(len(scan.mentions) for _, scan in self._scans.values())
+
+
+def probabilities_from_scan(
+    scan: ArticleScan,
+    question_entities: List[str],
+    is_comparative: bool
+) -> List[Tuple[float, str, float]]:
+    """
+    Apply the question-dependent entity checks to a scanned article
+    """
+    results = []
+    entities = [ent.lower() for ent in question_entities]
+    n_entities = len(entities)
+
+    # percent confidence carries over from one match to the next within
+    # a pattern, exactly as the original per-pattern loop variable did
+    carried = [confidence for _, confidence in _PERCENT_PATTERNS]
+
+    for m in scan.mentions:
+        if entities:
+            entity_matches = scan.count_terms_in_window(entities, m.start, m.end)
+
+        if m.kind == _PERCENT:
+            confidence = carried[m.pattern]
+
+            # STRICT VALIDATION
+            if entities:
+                # Comparative questions need BOTH entities
+                required_matches = n_entities if is_comparative else max(1, n_entities // 2)
+
+                if entity_matches < required_matches:
+                    continue
+
+                # Boost confidence for multiple entity matches
+                if entity_matches >= n_entities:
+                    confidence *= 1.5
+                elif entity_matches >= required_matches:
+                    confidence *= 1.2
+
+            # Boost for probability keywords
+            if m.has_keyword:
+                confidence *= 1.3
+
+            # Penalize if near year dates (often GDP %, not probabilities)
+            if m.has_year:
+                confidence *= 0.6
+
+            # Penalize if near financial terms (price changes, not probabilities)
+            if m.has_financial:
+                confidence *= 0.5
+
+            carried[m.pattern] = confidence
+            results.append((m.probs[0], scan.context(m), min(1.0, confidence)))
+
+        elif m.kind == _FRACTION:
+            conf = m.conf
+            if entities:
+                required_matches = n_entities if is_comparative else 1
+                if entity_matches < required_matches:
+                    continue
+                conf *= 1.2
+
+            context = scan.context(m)
+            for prob in m.probs:
+                results.append((prob, context, conf))
+
+        else:
+            if entities and entity_matches < 1:
+                continue
+            results.append((m.probs[0], scan.context(m), m.conf))
+
     return results
 
 
+def extract_all_probabilities(text: str, question: str = "", context_window: int = 200) -> List[Tuple[float, str, float]]:
+    """
+    Extract probabilities with STRICT validation
+    Only returns probabilities actually relevant to the question
+    """
+    question_entities = extract_key_entities(question) if question else []
+    is_comparative = is_comparative_question(question)
+
+    return probabilities_from_scan(ArticleScan(text, context_window), question_entities, is_comparative)
+
+
+_WORD4_RE = re.compile(r'\b\w{4,}\b')
+
+
+@lru_cache(maxsize=65536)
+def _word_set(text: str) -> frozenset:
+    """Lowercase words of 4+ chars; cached since contexts and questions repeat across markets"""
+    return frozenset(_WORD4_RE.findall(text.lower()))
+
+
 def calculate_relevance_score(context: str, question: str) -> float:
     """Relevance score with stricter thresholds"""
-    question_words = set(re.findall(r'\b\w{4,}\b', question.lower()))
-    context_words = set(re.findall(r'\b\w{4,}\b', context.lower()))
+    question_words = _word_set(question)
+    context_words = _word_set(context)
     
     if not question_words:
         return 0.0
@@ -348,66 +499,94 @@ def _get_source_credibility(article: Dict) -> float:
 # SENTIMENT
 # ============================================================================
 
-def calculate_universal_sentiment(
+def _head_words(article: Dict) -> frozenset:
+    """Words (4+ chars) of title + first 500 chars; cached on Article records"""
+    words = article.get('head_words')
+    if words is None:
+        title = article.get('title', '')
+        text = article.get('fulltext', '')[:500]
+        words = frozenset(_WORD4_RE.findall(f"{title} {text}".lower()))
+        if 'head_words' in article:
+            article['head_words'] = words
+    return words
+
+
+def submit_universal_sentiment(
     articles: List[Dict],
     question: str,
     classifier_model,
     max_articles: int = 15
-) -> Tuple[float, float]:
-    """Zero-shot sentiment classification"""
+) -> Callable[[], Tuple[float, float]]:
+    """
+    Queue the zero-shot sentiment classification without waiting for it.
+    Returns a function that waits for the results and gives (sentiment, confidence).
+    """
     time_weights = calculate_time_weights(articles)
     
+    question_words = _word_set(question)
+    
     article_scores = []
     for idx, article in enumerate(articles[:300]):
-        title = article.get('title', '')
-        text = article.get('fulltext', '')[:500]
-        combined = f"{title} {text}".lower()
-        
-        question_words = set(re.findall(r'\b\w{4,}\b', question.lower()))
-        text_words = set(re.findall(r'\b\w{4,}\b', combined))
-        
-        overlap = len(question_words & text_words)
+        overlap = len(question_words & _head_words(article))
         relevance = overlap / len(question_words) if question_words else 0
         
         score = relevance * time_weights[idx]
         article_scores.append((idx, score, article))
     
     article_scores.sort(key=lambda x: x[1], reverse=True)
-    top_articles = [a[2] for a in article_scores[:max_articles] if a[1] > 0.01]
+    # (rank in article_scores, article); the rank indexes time_weights below
+    top_articles = [(rank, a[2]) for rank, a in enumerate(article_scores[:max_articles]) if a[1] > 0.01]
     
     if len(top_articles) < 3:
-        return 0.5, 0.1
+        return lambda: (0.5, 0.1)
     
     hypotheses = [
         f"YES: {question}",
         f"NO: {question}"
     ]
     
+    scored = []
+    for rank, article in top_articles:
+        text = article.get('fulltext', '')[:1000]
+        
+        if len(text) < 100:
+            continue
+        
+        scored.append((rank, text))
+    
+    # One batched pass over every (article, YES/NO) pair; with the cascade on,
+    # only articles the distilled model is unsure about reach the full model
+    texts = [text for _, text in scored]
+    if NLI_CASCADE_ENABLED:
+        pending = zero_shot_cascade_submit(classifier_model, texts, hypotheses, NLI_CASCADE_BAND)
+    else:
+        pending = zero_shot_submit(classifier_model, texts, hypotheses)
+    
+    return lambda: _combine_sentiment(pending.result(), scored, hypotheses, time_weights)
+
+
+def _combine_sentiment(
+    results: List[Optional[Dict]],
+    scored: List[Tuple[int, str]],
+    hypotheses: List[str],
+    time_weights: np.ndarray
+) -> Tuple[float, float]:
     sentiments = []
     confidences = []
     article_weights = []
     
-    for article in top_articles:
-        text = article.get('fulltext', '')[:1000]
-        
-        if len(text) < 100:
+    for (rank, _), result in zip(scored, results):
+        if result is None:
             continue
         
         try:
-            result = classifier_model(
-                text,
-                candidate_labels=hypotheses,
-                multi_label=False
-            )
-            
             yes_idx = result['labels'].index(hypotheses[0])
             prob_yes = result['scores'][yes_idx]
             
             sentiments.append(prob_yes)
             confidences.append(abs(prob_yes - 0.5) * 2)
             
-            orig_idx = next(i for i, (j, _, a) in enumerate(article_scores) if a == article)
-            article_weights.append(time_weights[orig_idx])
+            article_weights.append(time_weights[rank])
             
         except:
             continue
@@ -428,6 +607,16 @@ def calculate_universal_sentiment(
     return sentiment, avg_confidence
 
 
+def calculate_universal_sentiment(
+    articles: List[Dict],
+    question: str,
+    classifier_model,
+    max_articles: int = 15
+) -> Tuple[float, float]:
+    """Zero-shot sentiment classification"""
+    return submit_universal_sentiment(articles, question, classifier_model, max_articles)()
+
+
 # ============================================================================
 # MAIN SIGNAL EXTRACTION (FIXED)
 # ============================================================================
@@ -438,19 +627,32 @@ def extract_all_signals(
     classifier_model,
     market_hours: Optional[float] = None,
     market=None,
+    mention_index: Optional[MentionIndex] = None,
 ) -> Dict:
     """
     Extract signals with improved recency, source credibility, and a simple ensemble.
     Returns final_estimate plus provenance.
+    Pass a MentionIndex shared across markets to skip rescanning articles.
     """
     # 1. Time weights (adaptive)
     time_weights = calculate_time_weights(articles, market_hours=market_hours)
 
+    # Queue the sentiment classification now; it runs on the inference worker
+    # while the probability mentions below are extracted (collected in step 4)
+    pending_sentiment = submit_universal_sentiment(
+        articles, question, classifier_model, max_articles=40
+    )
+
     # 2. Extract probabilities from articles (include article metadata for credibility)
+    question_entities = extract_key_entities(question) if question else []
+    is_comparative = is_comparative_question(question)
     all_probs = []
     for idx, article in enumerate(articles[:150]):  # increased pool
-        text = article.get('fulltext', '')[:5000]
-        probs = extract_all_probabilities(text, question=question)
+        if mention_index is not None:
+            scan = mention_index.scan(article)
+        else:
+            scan = ArticleScan(article.get('fulltext', '')[:5000])
+        probs = probabilities_from_scan(scan, question_entities, is_comparative)
         for prob, context, conf in probs:
             all_probs.append((prob, context, conf, article))
 
@@ -458,9 +660,7 @@ def extract_all_signals(
     prob_estimate = aggregate_probabilities(all_probs, question, time_weights=time_weights, articles=articles)
 
     # 4. Sentiment estimate (as before, but allow classifier to use more articles)
-    sentiment, sentiment_conf = calculate_universal_sentiment(
-        articles, question, classifier_model, max_articles=40
-    )
+    sentiment, sentiment_conf = pending_sentiment()
 
     # 5. Build an ensemble: weights adapt to signal quality
     signals = []
@@ -505,7 +705,7 @@ def extract_all_signals(
 
     final_estimate = float(np.average(signals, weights=weights))
     # incorporate optional market-level external forecast if available
-    ext = market.get('external_forecast') if isinstance(market, dict) else None
+    ext = market.get('external_forecast') if market is not None else None
     if ext is not None:
         try:
             ext_val = float(ext)
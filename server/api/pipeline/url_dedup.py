@@ -0,0 +1,117 @@
+"""
+url_dedup.py - Canonical-URL deduplication for article downloads
+Broad NewsAPI queries overlap heavily; each canonical URL is fetched once.
+"""
+import re
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# query parameters that only track the click, never change the article
+_TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'yclid', 'mkt_tok',
+    'cmpid', 'cmp', 'ref', 'ref_src', 'referrer', 'smid', 'smtyp',
+    'soc_src', 'soc_trk', 'ocid', 'ito', 'taid', 'guccounter', 'outputtype', 'amp'
+}
+_TRACKING_PREFIXES = ('utm_', 'mc_', 'pk_', 'hsa_', 'at_', 'sc_', 'ns_', '_hs')
+
+_HOST_PREFIXES = ('www.', 'm.', 'amp.', 'mobile.')
+_AMP_PATH_RE = re.compile(r'(/amp|/amp\.html|\.amp)$', re.I)
+
+
+def canonicalize_url(url: str) -> Optional[str]:
+    """
+    Normalize a URL so that trivially different links to the same article
+    compare equal: https scheme, lowercase host without www/m/amp prefixes,
+    no default port, no AMP suffix, no trailing slash, tracking params
+    stripped, remaining params sorted, fragment dropped.
+    """
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if not parts.netloc:
+        return url.strip()
+
+    host = (parts.hostname or '').lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    path = _AMP_PATH_RE.sub('', path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit(('https', host, path or '/', urlencode(query), ''))
+
+
+class UrlDedupIndex:
+    """
+    Run-wide set of canonical URLs already claimed for download.
+    Final URLs after redirects are claimed too, so later links that point
+    straight at a redirect target are skipped before fetching.
+    """
+
+    def __init__(self):
+        self._claimed: Dict[str, str] = {}
+        self.stats = {
+            'seen': 0,
+            'unique': 0,
+            'duplicate_urls': 0,        # skipped before fetch
+            'redirect_duplicates': 0,   # found only after following a redirect
+        }
+
+    def claim(self, url: str) -> bool:
+        """True if this URL should be fetched (first time its canonical form is seen)"""
+        self.stats['seen'] += 1
+        canonical = canonicalize_url(url)
+        if canonical is None:
+            return False
+        if canonical in self._claimed:
+            self.stats['duplicate_urls'] += 1
+            return False
+        self._claimed[canonical] = url
+        self.stats['unique'] += 1
+        return True
+
+    def claim_final(self, url: str, final_url: Optional[str]) -> bool:
+        """
+        Record where `url` ended up after redirects.
+        False if another fetched URL already resolved to the same article.
+        """
+        if not final_url:
+            return True
+        source = canonicalize_url(url)
+        final = canonicalize_url(final_url)
+        if final is None or final == source:
+            return True
+        owner = self._claimed.get(final)
+        if owner is not None and canonicalize_url(owner) != source:
+            self.stats['redirect_duplicates'] += 1
+            return False
+        self._claimed[final] = url
+        return True
+
+    @property
+    def fetches_saved(self) -> int:
+        return self.stats['duplicate_urls']
+
+    def summary(self) -> str:
+        return (f"{self.stats['seen']} URLs → {self.stats['unique']} unique | "
+                f"{self.fetches_saved} fetches saved | "
+                f"{self.stats['redirect_duplicates']} redirect duplicates dropped")
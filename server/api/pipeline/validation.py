@@ -9,35 +9,43 @@ Key issues found:
 """
 import re
 import numpy as np
+from concurrent.futures import Future
 from typing import Dict, List, Tuple, Optional
 
+from .nli import zero_shot_submit
+from .records import Market, Article, Opportunity
+
 
 # ============================================================================
 # RELAXED MARKET CLASSIFICATION
 # ============================================================================
 
-def classify_market_realism(question: str, classifier) -> Tuple[str, float]:
+REALISM_CATEGORIES = [
+    "Serious forecasting market about politics, economics, sports, or technology",
+    "Speculative or meme market about supernatural, impossible, or joke events",
+    "Personal subjective question with no objective resolution"
+]
+
+
+def submit_market_realism(question: str, classifier) -> Future:
+    """Queue the realism classification; pass the Future to classify_market_realism"""
+    return zero_shot_submit(classifier, [question], REALISM_CATEGORIES)
+
+
+def classify_market_realism(question: str, classifier, pending: Optional[Future] = None) -> Tuple[str, float]:
     """Classify market type - MORE LENIENT"""
-    categories = [
-        "Serious forecasting market about politics, economics, sports, or technology",
-        "Speculative or meme market about supernatural, impossible, or joke events",
-        "Personal subjective question with no objective resolution"
-    ]
+    if pending is None:
+        pending = submit_market_realism(question, classifier)
     
-    try:
-        result = classifier(
-            question,
-            candidate_labels=categories,
-            multi_label=False
-        )
-        return result['labels'][0], result['scores'][0]
-    except:
-        return categories[0], 0.5
+    result = pending.result()[0]
+    if result is None:
+        return REALISM_CATEGORIES[0], 0.5
+    return result['labels'][0], result['scores'][0]
 
 
-def is_forecasting_grade_market(question: str, classifier) -> bool:
+def is_forecasting_grade_market(question: str, classifier, pending: Optional[Future] = None) -> bool:
     """RELAXED: Only reject obvious garbage"""
-    category, confidence = classify_market_realism(question, classifier)
+    category, confidence = classify_market_realism(question, classifier, pending)
     
     # Much higher threshold - only reject if VERY confident it's garbage
     if 'Speculative' in category and confidence > 0.80:  # Was 0.70
@@ -139,15 +147,15 @@ def get_time_adjusted_thresholds(hours_until_close: float) -> Dict[str, float]:
 def is_edge_plausible(
     market_price: float,
     model_estimate: float,
-    market: Dict
+    market: Market
 ) -> Tuple[bool, str]:
     """
     RELAXED edge validation for your data
     Your diagnostic showed: edges up to 46% with good signals (36 prob mentions)
     """
     edge = abs(model_estimate - market_price)
-    hours = market.get('hours_until_close', 720)
-    num_prob_mentions = market.get('num_prob_mentions', 0)  # Add this context
+    hours = market.hours_until_close
+    num_prob_mentions = market.num_prob_mentions  # Set by passes_sanity_checks
     
     thresholds = get_time_adjusted_thresholds(hours)
     
@@ -168,9 +176,7 @@ def is_edge_plausible(
         return False, "Implausible 48+ point move on >98% market"
     
     # Rule 3: High liquidity (MUCH MORE LENIENT - your data had $223k liquid market)
-    liquidity = market.get('liquidity', 0)
-    volume = market.get('volume', 0)
-    max_activity = max(liquidity, volume)
+    max_activity = max(market.liquidity, market.volume)
     
     # Allow up to 35% edge even on $200k+ markets if signal is strong
     if max_activity > 200000 and edge > 0.35:
@@ -188,30 +194,32 @@ def is_edge_plausible(
 # ============================================================================
 
 def passes_sanity_checks(
-    market: Dict,
+    market: Market,
     signal_data: Dict,
     classifier,
-    verbose: bool = False
+    verbose: bool = False,
+    realism: Optional[Future] = None
 ) -> Tuple[bool, str]:
     """
     CUSTOM TUNED for your data - only rejects obvious garbage
+    realism: Future from submit_market_realism, if already queued
     """
-    question = market['question']
+    question = market.question
     model_estimate = signal_data['final_estimate']
-    market_price = market['yes_price']
+    market_price = market.yes_price
     edge = abs(model_estimate - market_price)
-    hours = market.get('hours_until_close', 720)
+    hours = market.hours_until_close
     num_prob_mentions = signal_data.get('num_prob_mentions', 0)
     confidence = signal_data.get('confidence', 0)
     
-    # Add num_prob_mentions to market dict for is_edge_plausible
-    market['num_prob_mentions'] = num_prob_mentions
+    # Record num_prob_mentions on the market for is_edge_plausible
+    market.num_prob_mentions = num_prob_mentions
     
     # Get thresholds
     thresholds = get_time_adjusted_thresholds(hours)
     
     # Check 1: Forecasting-grade (RELAXED)
-    if not is_forecasting_grade_market(question, classifier):
+    if not is_forecasting_grade_market(question, classifier, realism):
         return False, "Non-forecasting-grade market"
     
     # Check 2: Personal markets (MORE SPECIFIC)
@@ -258,10 +266,10 @@ def passes_sanity_checks(
 # ============================================================================
 
 def filter_opportunities(
-    opportunities: List[Dict],
+    opportunities: List[Opportunity],
     classifier,
     verbose: bool = True
-) -> List[Dict]:
+) -> List[Opportunity]:
     """Filter opportunities"""
     if verbose:
         print("\n🔍 Running custom-tuned sanity checks...")
@@ -269,11 +277,14 @@ def filter_opportunities(
     filtered = []
     rejection_reasons = {}
     
-    for opp in opportunities:
-        market = opp['market']
-        signal_data = opp['signal_data']
+    # Queue every realism classification up front so they share micro-batches
+    realism = [submit_market_realism(opp.market.question, classifier) for opp in opportunities]
+    
+    for opp, pending in zip(opportunities, realism):
+        market = opp.market
+        signal_data = opp.signal_data
         
-        passes, reason = passes_sanity_checks(market, signal_data, classifier, verbose=False)
+        passes, reason = passes_sanity_checks(market, signal_data, classifier, verbose=False, realism=pending)
         
         if passes:
             filtered.append(opp)
@@ -281,24 +292,29 @@ def filter_opportunities(
             rejection_reasons[reason] = rejection_reasons.get(reason, 0) + 1
     
     if verbose:
-        print(f"\n✅ Filtered: {len(opportunities)} → {len(filtered)} opportunities")
-        
-        if rejection_reasons:
-            print(f"\n❌ Rejection reasons:")
-            for reason, count in sorted(rejection_reasons.items(), key=lambda x: x[1], reverse=True)[:10]:
-                print(f"   • {reason}: {count}")
+        report_filtering(len(opportunities), len(filtered), rejection_reasons)
     
     return filtered
 
 
+def report_filtering(n_before: int, n_after: int, rejection_reasons: Dict[str, int]) -> None:
+    """Print the filter summary and the most common rejection reasons"""
+    print(f"\n✅ Filtered: {n_before} → {n_after} opportunities")
+    
+    if rejection_reasons:
+        print(f"\n❌ Rejection reasons:")
+        for reason, count in sorted(rejection_reasons.items(), key=lambda x: x[1], reverse=True)[:10]:
+            print(f"   • {reason}: {count}")
+
+
 # ============================================================================
 # CONFIDENCE RECALIBRATION (More generous for strong signals)
 # ============================================================================
 
 def recalibrate_confidence(
     signal_data: Dict,
-    market: Dict,
-    articles: List[Dict]
+    market: Market,
+    articles: List[Article]
 ) -> float:
     """
     TUNED for your data - you have good probability mentions (avg 19.8)
@@ -342,9 +358,7 @@ def recalibrate_confidence(
         factors.append(0.45)
     
     # Factor 4: Market liquidity (LESS HARSH)
-    liquidity = market.get('liquidity', 0)
-    volume = market.get('volume', 0)
-    max_activity = max(liquidity, volume)
+    max_activity = max(market.liquidity, market.volume)
     
     if max_activity > 200000:
         factors.append(0.55)     # Was 0.50, slightly more generous
@@ -366,7 +380,7 @@ def recalibrate_confidence(
         factors.append(0.50)
     
     # Factor 6: Time horizon (LESS HARSH)
-    hours = market.get('hours_until_close', 720)
+    hours = market.hours_until_close
     if hours < 168:  # <1 week
         factors.append(0.85)
     elif hours < 720:  # <1 month